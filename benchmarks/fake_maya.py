@@ -0,0 +1,543 @@
+import collections
+import json
+import sys
+import types
+
+
+DEFAULT_NODES = {"defaultShaderList1", "defaultTextureList1", "defaultRenderUtilityList1", "renderPartition"}
+
+
+class FakeScene(object):
+
+    def __init__(self, workspace_root=""):
+        self.workspace_root = workspace_root
+        self.nodes = {}
+        # destination plug -> source plug, plus every destination plug touching a node so lookups stay O(degree)
+        self.connections = {}
+        self.links = collections.defaultdict(set)
+        self.array_sizes = {}
+        self.name_counters = {}
+        self.selection = []
+        self.calls = collections.Counter()
+        self.api_calls = collections.Counter()
+        self.commands = {}
+        for name, node_type in [
+            ("defaultShaderList1", "defaultShaderList"),
+            ("defaultTextureList1", "defaultTextureList"),
+            ("defaultRenderUtilityList1", "defaultRenderUtilityList"),
+            ("renderPartition", "partition"),
+        ]:
+            self.add_node(name, node_type)
+
+    def unique_name(self, name):
+        if name not in self.nodes:
+            return name
+        base = name.rstrip("0123456789")
+        counter = self.name_counters.get(base, 1)
+        while f"{base}{counter}" in self.nodes:
+            counter += 1
+        self.name_counters[base] = counter + 1
+        return f"{base}{counter}"
+
+    def add_node(self, name, node_type):
+        name = self.unique_name(name)
+        self.nodes[name] = {"type": node_type, "attrs": {}}
+        return name
+
+    def rename(self, old, new):
+        node = self.nodes.pop(old)
+        new = self.unique_name(new)
+        self.nodes[new] = node
+        for dst in list(self.links.pop(old, ())):
+            src = self.connections[dst]
+            self.disconnect(src, dst)
+            dst = f"{new}.{dst.split('.', 1)[1]}" if dst.split(".")[0] == old else dst
+            src = f"{new}.{src.split('.', 1)[1]}" if src.split(".")[0] == old else src
+            self.connect(src, dst, True)
+        return new
+
+    def delete(self, name):
+        for dst in list(self.links.get(name, ())):
+            self.disconnect(self.connections[dst], dst)
+        self.links.pop(name, None)
+        self.nodes.pop(name, None)
+
+    def connect(self, src, dst, force=False):
+        if dst in self.connections:
+            if not force:
+                raise RuntimeError(f"{dst} is already connected")
+            self.disconnect(self.connections[dst], dst)
+        for plug in (src, dst):
+            if plug.split(".")[0] not in self.nodes:
+                raise RuntimeError(f"No object matches name: {plug}")
+        self.connections[dst] = src
+        self.links[src.split(".")[0]].add(dst)
+        self.links[dst.split(".")[0]].add(dst)
+        if dst.endswith("]"):
+            array_plug, index = dst[:-1].rsplit("[", 1)
+            self.array_sizes[array_plug] = max(self.array_sizes.get(array_plug, 0), int(index) + 1)
+
+    def disconnect(self, src, dst):
+        if self.connections.get(dst) == src:
+            del self.connections[dst]
+            self.links[src.split(".")[0]].discard(dst)
+            self.links[dst.split(".")[0]].discard(dst)
+
+    def upstream(self, names):
+        found = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in found or name not in self.nodes:
+                continue
+            found.add(name)
+            stack.extend(
+                self.connections[dst].split(".")[0] for dst in self.links.get(name, ()) if dst.split(".")[0] == name
+            )
+        return found
+
+    def export_nodes(self, path, names):
+        exported = self.upstream(names)
+        connections = []
+        for name in exported:
+            for dst in self.links.get(name, ()):
+                src = self.connections[dst]
+                src_node, dst_node = src.split(".")[0], dst.split(".")[0]
+                if src_node == name and (dst_node in exported or dst_node in DEFAULT_NODES):
+                    connections.append([src, dst])
+        with open(path, "w") as export_file:
+            json.dump({
+                "nodes": {name: self.nodes[name] for name in sorted(exported)},
+                "connections": sorted(set(map(tuple, connections)))
+            }, export_file)
+        return path
+
+    def import_nodes(self, path):
+        with open(path) as import_file:
+            data = json.load(import_file)
+        names = {}
+        for name, node in data["nodes"].items():
+            names[name] = self.add_node(name, node["type"])
+            self.nodes[names[name]]["attrs"] = dict(node["attrs"])
+
+        def rename(plug):
+            node, attr = plug.split(".", 1)
+            return f"{names.get(node, node)}.{attr}"
+
+        for src, dst in data["connections"]:
+            dst = rename(dst)
+            if dst.split(".")[0] not in names.values() and dst.endswith("]"):
+                # Connections to default nodes are written with -na, they take the next free index
+                array_plug = dst[:-1].rsplit("[", 1)[0]
+                dst = f"{array_plug}[{self.next_index(array_plug)}]"
+            self.connect(rename(src), dst, True)
+        return list(names.values())
+
+    def next_index(self, array_plug):
+        return self.array_sizes.get(array_plug, 0)
+
+    def array_indices(self, array_plug):
+        prefix = f"{array_plug}["
+        return [int(dst[len(prefix):-1]) for dst in self.links.get(array_plug.split(".")[0], ()) if dst.startswith(prefix)]
+
+
+scene = FakeScene()
+
+
+def _counted(name, func):
+    def wrapper(*args, **kwargs):
+        scene.calls[name] += 1
+        return func(*args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+
+def _make_cmds():
+    cmds = types.ModuleType("maya.cmds")
+
+    def workspace(*args, **kwargs):
+        return scene.workspace_root
+
+    def objExists(name):
+        return name.split(".")[0] in scene.nodes
+
+    def shadingNode(node_type, name=None, **kwargs):
+        node = scene.add_node(name or f"{node_type}1", node_type)
+        if kwargs.get("asShader"):
+            lists = "defaultShaderList1.shaders"
+        elif kwargs.get("asTexture"):
+            lists = "defaultTextureList1.textures"
+        else:
+            lists = "defaultRenderUtilityList1.utilities"
+        scene.connect(f"{node}.message", f"{lists}[{scene.next_index(lists)}]")
+        return node
+
+    def createNode(node_type, name=None, **kwargs):
+        return scene.add_node(name or f"{node_type}1", node_type)
+
+    def sets(*args, **kwargs):
+        if kwargs.get("forceElement"):
+            for member in args[0] if args and isinstance(args[0], (list, tuple)) else args:
+                scene.connect(f"{member}.instObjGroups[0]", f"{kwargs['forceElement']}.dagSetMembers[{scene.next_index(kwargs['forceElement'] + '.dagSetMembers')}]")
+            return None
+        node = scene.add_node(kwargs.get("name", "set1"), "shadingEngine")
+        scene.connect(f"{node}.partition", f"renderPartition.sets[{scene.next_index('renderPartition.sets')}]")
+        return node
+
+    def setAttr(plug, *values, **kwargs):
+        node, attr = plug.split(".", 1)
+        if node not in scene.nodes:
+            raise RuntimeError(f"No object matches name: {plug}")
+        scene.nodes[node]["attrs"][attr] = values[0] if len(values) == 1 else values
+
+    def getAttr(plug, **kwargs):
+        if "*" in plug:
+            node_type_attr = plug.split(".", 1)
+            return [
+                node["attrs"].get(node_type_attr[1], "")
+                for node in scene.nodes.values()
+            ]
+        node, attr = plug.split(".", 1)
+        if node not in scene.nodes:
+            raise ValueError(f"No object matches name: {plug}")
+        return scene.nodes[node]["attrs"].get(attr, 0)
+
+    def connectAttr(src, dst, force=False, **kwargs):
+        scene.connect(src, dst, force)
+
+    def disconnectAttr(src, dst, **kwargs):
+        scene.disconnect(src, dst)
+
+    def listConnections(plug=None, source=True, destination=True, plugs=False, connections=False, type=None, **kwargs):
+        result = []
+        if plug is None:
+            return result
+        node_only = "." not in plug
+        for dst in sorted(scene.links.get(plug.split(".")[0], ())):
+            src = scene.connections[dst]
+            if source and (dst == plug or (node_only and dst.startswith(f"{plug}."))):
+                other = src
+            elif destination and (src == plug or (node_only and src.startswith(f"{plug}."))):
+                other = dst
+            else:
+                continue
+            other_node = other.split(".")[0]
+            if type and scene.nodes.get(other_node, {}).get("type") != type:
+                continue
+            result.append(other if plugs else other_node)
+        return result or None
+
+    def ls(*args, **kwargs):
+        if kwargs.get("nodeTypes"):
+            return ["aiStandardSurface", "shadingEngine", "file", "place2dTexture", "aiNormalMap"]
+        if kwargs.get("selection"):
+            return list(scene.selection)
+        types_filter = kwargs.get("type") or kwargs.get("exactType")
+        if isinstance(types_filter, str):
+            types_filter = [types_filter]
+        if args:
+            names = [args[0]] if isinstance(args[0], str) else args[0]
+            nodes = [(name, scene.nodes[name]) for name in names if name in scene.nodes]
+        else:
+            nodes = scene.nodes.items()
+        result = []
+        for name, node in nodes:
+            if types_filter and node["type"] not in types_filter:
+                continue
+            result.append(name)
+            if kwargs.get("showType"):
+                result.append(node["type"])
+        return result
+
+    def nodeType(name):
+        return scene.nodes[name]["type"]
+
+    def delete(*names):
+        names = [args for args in names if isinstance(args, str)] + [
+            name for args in names if not isinstance(args, str) for name in args
+        ]
+        for name in names:
+            scene.delete(name)
+
+    def loadPlugin(path, quiet=False):
+        module_name = path.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+        module = sys.modules.get(module_name) or __import__(module_name)
+        module.initializePlugin(None)
+
+    def pluginInfo(*args, **kwargs):
+        return False
+
+    def undoInfo(*args, **kwargs):
+        return None
+
+    def select(*args, **kwargs):
+        if kwargs.get("clear"):
+            scene.selection = []
+            return None
+        names = [args[0]] if args and isinstance(args[0], str) else list(args[0] if args else [])
+        missing = [name for name in names if name not in scene.nodes]
+        if missing:
+            raise ValueError(f"No object matches name: {missing[0]}")
+        scene.selection = names if kwargs.get("replace", True) else scene.selection + names
+        return None
+
+    def file(*args, **kwargs):
+        # Exported "scenes" are JSON dumps of the selection and its upstream history, enough to import back
+        if kwargs.get("exportSelected"):
+            return scene.export_nodes(args[0], scene.selection)
+        if kwargs.get("i") or kwargs.get("import"):
+            return scene.import_nodes(args[0])
+        return None
+
+    def about(*args, **kwargs):
+        return "2024"
+
+    def evalDeferred(command, **kwargs):
+        # There is no idle queue without Maya, deferred commands run straight away
+        if callable(command):
+            command()
+        return None
+
+    for name, func in list(locals().items()):
+        if callable(func):
+            setattr(cmds, name, _counted(name, func))
+
+    def __getattr__(name):
+        if name in scene.commands:
+            return scene.commands[name]
+        raise AttributeError(name)
+
+    cmds.__getattr__ = __getattr__
+    return cmds
+
+
+def _make_open_maya():
+    om = types.ModuleType("maya.api.OpenMaya")
+
+    class MGlobal(object):
+        messages = []
+
+        @staticmethod
+        def displayInfo(message):
+            MGlobal.messages.append(("info", message))
+
+        @staticmethod
+        def displayWarning(message):
+            MGlobal.messages.append(("warning", message))
+
+        @staticmethod
+        def displayError(message):
+            MGlobal.messages.append(("error", message))
+
+    class MObject(object):
+
+        def __init__(self, name=None):
+            self.name = name
+
+        def isNull(self):
+            return self.name is None
+
+    class MPlug(object):
+
+        def __init__(self, node, attr):
+            self.node_object = node
+            self.attr = attr
+
+        def name(self):
+            return f"{self.node_object.name}.{self.attr}"
+
+        def __eq__(self, other):
+            return isinstance(other, MPlug) and self.name() == other.name()
+
+        def node(self):
+            return self.node_object
+
+        @property
+        def isDestination(self):
+            return self.name() in scene.connections
+
+        def source(self):
+            node, attr = scene.connections[self.name()].split(".", 1)
+            return MPlug(MObject(node), attr)
+
+        def getExistingArrayAttributeIndices(self):
+            return scene.array_indices(self.name())
+
+        def elementByLogicalIndex(self, index):
+            return MPlug(self.node_object, f"{self.attr}[{index}]")
+
+        def asString(self):
+            return scene.nodes[self.node_object.name]["attrs"].get(self.attr, "")
+
+    class MFnDependencyNode(object):
+
+        def __init__(self, node=None):
+            self.node = node
+
+        def findPlug(self, attr, want_networked):
+            scene.api_calls["findPlug"] += 1
+            return MPlug(self.node, attr)
+
+        def name(self):
+            return self.node.name
+
+        def typeName(self):
+            return scene.nodes[self.node.name]["type"]
+
+    class MSelectionList(object):
+
+        def __init__(self):
+            self.items = []
+
+        def add(self, name):
+            scene.api_calls["MSelectionList.add"] += 1
+            if name.split(".")[0] not in scene.nodes:
+                raise RuntimeError(f"No object matches name: {name}")
+            self.items.append(name)
+            return self
+
+        def getDependNode(self, index):
+            return MObject(self.items[index].split(".")[0])
+
+        def length(self):
+            return len(self.items)
+
+    class MDGModifier(object):
+
+        def __init__(self):
+            self.operations = []
+            self.done = []
+
+        def createNode(self, node_type):
+            scene.api_calls["MDGModifier.createNode"] += 1
+            node = MObject(f"__pending{id(self)}_{len(self.operations)}")
+            self.operations.append(("create", node, node_type))
+            return node
+
+        def renameNode(self, node, name):
+            scene.api_calls["MDGModifier.renameNode"] += 1
+            self.operations.append(("rename", node, name))
+
+        def newPlugValue(self, plug, value):
+            scene.api_calls["MDGModifier.newPlugValue"] += 1
+            self.operations.append(("set", plug, value))
+
+        newPlugValueString = newPlugValue
+        newPlugValueInt = newPlugValue
+        newPlugValueFloat = newPlugValue
+        newPlugValueBool = newPlugValue
+        newPlugValueDouble = newPlugValue
+
+        def connect(self, src, dst):
+            scene.api_calls["MDGModifier.connect"] += 1
+            self.operations.append(("connect", src, dst))
+
+        def disconnect(self, src, dst):
+            scene.api_calls["MDGModifier.disconnect"] += 1
+            self.operations.append(("disconnect", src, dst))
+
+        def deleteNode(self, node):
+            self.operations.append(("delete", node))
+
+        def doIt(self):
+            scene.api_calls["MDGModifier.doIt"] += 1
+            for operation in self.operations[len(self.done):]:
+                kind = operation[0]
+                if kind == "create":
+                    node = operation[1]
+                    node.name = scene.add_node(operation[2] + "1", operation[2])
+                elif kind == "rename":
+                    operation[1].name = scene.rename(operation[1].name, operation[2])
+                elif kind == "set":
+                    plug = operation[1]
+                    scene.nodes[plug.node_object.name]["attrs"][plug.attr] = operation[2]
+                elif kind == "connect":
+                    scene.connect(operation[1].name(), operation[2].name())
+                elif kind == "disconnect":
+                    scene.disconnect(operation[1].name(), operation[2].name())
+                elif kind == "delete":
+                    scene.delete(operation[1].name)
+                self.done.append(operation)
+
+        def undoIt(self):
+            for operation in reversed(self.done):
+                if operation[0] == "create":
+                    scene.delete(operation[1].name)
+                elif operation[0] == "connect":
+                    scene.disconnect(operation[1].name(), operation[2].name())
+            self.done = []
+
+    class MPxCommand(object):
+        pass
+
+    class MFnPlugin(object):
+
+        def __init__(self, plugin=None, *args):
+            pass
+
+        def registerCommand(self, name, command_class):
+            def command(*args, **kwargs):
+                scene.calls[name] += 1
+                instance = command_class()
+                instance.doIt(args)
+                return None
+            scene.commands[name] = command
+
+        def deregisterCommand(self, name):
+            scene.commands.pop(name, None)
+
+    for name, value in list(locals().items()):
+        if isinstance(value, type):
+            setattr(om, name, value)
+    return om
+
+
+def _make_open_maya_ui():
+    omui = types.ModuleType("maya.OpenMayaUI")
+
+    class MQtUtil(object):
+
+        @staticmethod
+        def mainWindow():
+            return 1
+
+    omui.MQtUtil = MQtUtil
+    return omui
+
+
+def reset(workspace_root=""):
+    # The fake modules look the scene up on every call, so a fresh scene needs no re-import
+    global scene
+    scene = FakeScene(workspace_root)
+    return scene
+
+
+def install(workspace_root=""):
+    reset(workspace_root)
+
+    maya = types.ModuleType("maya")
+    api = types.ModuleType("maya.api")
+    cmds = _make_cmds()
+    om = _make_open_maya()
+    omui = _make_open_maya_ui()
+    mel = types.ModuleType("maya.mel")
+    standalone = types.ModuleType("maya.standalone")
+    standalone.initialize = lambda *args, **kwargs: None
+    standalone.uninitialize = lambda *args, **kwargs: None
+    maya.cmds = cmds
+    maya.api = api
+    maya.mel = mel
+    maya.standalone = standalone
+    maya.OpenMayaUI = omui
+    api.OpenMaya = om
+
+    sys.modules.update({
+        "maya": maya,
+        "maya.api": api,
+        "maya.api.OpenMaya": om,
+        "maya.cmds": cmds,
+        "maya.OpenMayaUI": omui,
+        "maya.mel": mel,
+        "maya.standalone": standalone,
+    })
+    return scene
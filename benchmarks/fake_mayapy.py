@@ -0,0 +1,26 @@
+import os
+import runpy
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_maya
+
+
+def main():
+    # Stands in for mayapy: python fake_mayapy.py script.py [args...] runs the script against the fake Maya
+    if len(sys.argv) < 2:
+        print("usage: fake_mayapy.py script.py [args...]", file=sys.stderr)
+        return 2
+
+    fake_maya.install()
+    script = os.path.abspath(sys.argv[1])
+    sys.argv = sys.argv[1:]
+    sys.path.insert(0, os.path.dirname(script))
+    runpy.run_path(script, run_name="__main__")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import collections
+import sys
+import types
+
+calls = collections.Counter()
+
+
+class BoundSignal(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot=None):
+        self.slots = [] if slot is None else [connected for connected in self.slots if connected != slot]
+
+    def emit(self, *args):
+        calls[f"emit {self.name}"] += 1
+        for slot in list(self.slots):
+            slot(*args)
+
+    def __call__(self, *args, **kwargs):
+        calls[self.name] += 1
+        # Getters the stand-in does not model, such as verticalHeader(), return something chainable
+        return Chained()
+
+
+class Signal(object):
+
+    def __init__(self, *types):
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.setdefault(self.name, BoundSignal(self.name))
+
+
+class QtMeta(type):
+
+    def __getattr__(cls, name):
+        # Enum values such as QAbstractItemView.MultiSelection only need to be distinct
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return f"{cls.__name__}.{name}"
+
+
+class QObject(object, metaclass=QtMeta):
+
+    def __init__(self, *args, **kwargs):
+        calls[f"new {type(self).__name__}"] += 1
+        self.state = dict(kwargs)
+
+    def __getattr__(self, name):
+        # Anything the stand-in does not model is a no-op method that can double as a signal
+        if name.startswith("__") or name == "state":
+            raise AttributeError(name)
+        if name.startswith("set") and len(name) > 3:
+            key = name[3].lower() + name[4:]
+
+            def setter(*args):
+                calls[name] += 1
+                self.state[key] = args[0] if len(args) == 1 else args
+            return setter
+        return self.__dict__.setdefault(name, BoundSignal(name))
+
+
+class QRunnable(QObject):
+
+    def setAutoDelete(self, auto_delete):
+        self.state["autoDelete"] = auto_delete
+
+
+class QThreadPool(QObject):
+
+    instance = None
+
+    @classmethod
+    def globalInstance(cls):
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def start(self, runnable):
+        # Run inline so the benchmark measures the work, not thread scheduling
+        calls["QThreadPool.start"] += 1
+        runnable.run()
+
+    def waitForDone(self, msecs=-1):
+        return True
+
+
+class QCoreApplication(QObject):
+
+    @staticmethod
+    def processEvents(*args):
+        calls["processEvents"] += 1
+
+    @staticmethod
+    def instance():
+        return None
+
+
+class Namespace(object):
+
+    def __getattr__(self, name):
+        return name
+
+
+class QWidget(QObject):
+
+    def __init__(self, *args, **kwargs):
+        super(QWidget, self).__init__(*args, **kwargs)
+        self.items = []
+        if args and isinstance(args[0], str):
+            self.state["text"] = args[0]
+
+    def text(self):
+        return self.state.get("text", "")
+
+    def isChecked(self):
+        return bool(self.state.get("checked", False))
+
+    def isVisible(self):
+        return bool(self.state.get("visible", False))
+
+    def isHidden(self):
+        return not self.isVisible()
+
+    def show(self):
+        calls["show"] += 1
+        self.state["visible"] = True
+
+    def hide(self):
+        self.state["visible"] = False
+
+    def close(self):
+        self.hide()
+        return True
+
+    def addItems(self, items):
+        self.items.extend(items)
+
+    def currentText(self):
+        return self.items[0] if self.items else ""
+
+    def count(self):
+        return len(self.items)
+
+    def selectedItems(self):
+        return []
+
+    def wasCanceled(self):
+        return False
+
+    def sortIndicatorSection(self):
+        return -1
+
+    def sortIndicatorOrder(self):
+        return 0
+
+
+class Chained(QWidget):
+
+    def __init__(self):
+        self.state = {}
+        self.items = []
+
+
+class QDialog(QWidget):
+
+    Rejected = 0
+    Accepted = 1
+
+    def exec_(self):
+        calls["exec_"] += 1
+        self.accept()
+        return self.state.get("result", self.Accepted)
+
+    def accept(self):
+        self.state.setdefault("result", self.Accepted)
+        self.accepted.emit()
+
+    def reject(self):
+        self.state.setdefault("result", self.Rejected)
+        self.rejected.emit()
+
+
+def _make_module(name, base, members):
+    module = types.ModuleType(name)
+    for member in members:
+        setattr(module, member.__name__, member)
+
+    def __getattr__(class_name):
+        # Every class the stand-in does not model behaves like a plain instance of base
+        if class_name.startswith("__"):
+            raise AttributeError(class_name)
+        widget_class = type(class_name, (base,), {})
+        setattr(module, class_name, widget_class)
+        return widget_class
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+def install():
+    calls.clear()
+    QThreadPool.instance = None
+
+    pyside = types.ModuleType("PySide2")
+    pyside.QtCore = _make_module(
+        "PySide2.QtCore", QObject, [Signal, QObject, QRunnable, QThreadPool, QCoreApplication]
+    )
+    pyside.QtCore.Qt = Namespace()
+    pyside.QtWidgets = _make_module("PySide2.QtWidgets", QWidget, [QWidget, QDialog])
+    pyside.QtWidgets.QApplication = QCoreApplication
+    pyside.QtGui = _make_module("PySide2.QtGui", QObject, [])
+
+    shiboken = types.ModuleType("shiboken2")
+    shiboken.wrapInstance = lambda pointer, widget_class: widget_class()
+    shiboken.isValid = lambda widget: widget is not None
+
+    sys.modules.update({
+        "PySide2": pyside,
+        "PySide2.QtCore": pyside.QtCore,
+        "PySide2.QtWidgets": pyside.QtWidgets,
+        "PySide2.QtGui": pyside.QtGui,
+        "shiboken2": shiboken,
+    })
+    return calls
@@ -0,0 +1,130 @@
+import argparse
+import os
+import random
+import struct
+import time
+import zlib
+
+# suffix: chance that a material has this map
+DEFAULT_SUFFIX_MIX = {
+    "BaseColor": 1.0,
+    "Roughness": 0.9,
+    "Metallic": 0.5,
+    "Transmission": 0.05,
+    "Normal": 0.9,
+    "Height": 0.4,
+    "AO": 0.6
+}
+DEFAULT_EXTENSIONS = [".png", ".jpg", ".exr"]
+# Maps a channel-packed ORM texture replaces
+PACKED_SUFFIXES = {"AO", "Roughness", "Metallic"}
+NOISE_FILES = ["notes.txt", "reference.jpg", "Thumbs.db", "preview_turntable.png"]
+
+
+def png_header(width, height):
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + ihdr + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+
+
+def jpeg_header(width, height):
+    return b"\xff\xd8" + b"\xff\xc0" + struct.pack(">HBHHB", 17, 8, height, width, 3) + b"\x00" * 9
+
+
+def exr_header(width, height):
+    channels = b"".join(name + b"\x00" + struct.pack("<iB3xii", 1, 0, 1, 1) for name in (b"B", b"G", b"R")) + b"\x00"
+    data_window = struct.pack("<iiii", 0, 0, width - 1, height - 1)
+    return (
+        b"\x76\x2f\x31\x01" + struct.pack("<I", 2)
+        + b"channels\x00chlist\x00" + struct.pack("<i", len(channels)) + channels
+        + b"dataWindow\x00box2i\x00" + struct.pack("<i", 16) + data_window
+        + b"\x00"
+    )
+
+
+IMAGE_HEADERS = {
+    ".png": png_header,
+    ".jpg": jpeg_header,
+    ".exr": exr_header,
+}
+
+
+def directory_tree(depth, fan_out):
+    directories = [""]
+    level = [""]
+    for level_index in range(depth):
+        level = [
+            os.path.join(parent, f"dir{level_index}_{child}") for parent in level for child in range(fan_out)
+        ]
+        directories.extend(level)
+    return directories
+
+
+def generate_sourceimages(
+    project_root, materials=200, depth=2, fan_out=4, suffix_mix=None, extensions=None, udim_fraction=0.1,
+    udim_tiles=4, size=2048, noise_fraction=0.1, packed_fraction=0.0, age=3600, seed=0
+):
+    rng = random.Random(seed)
+    suffix_mix = suffix_mix or DEFAULT_SUFFIX_MIX
+    extensions = extensions or DEFAULT_EXTENSIONS
+
+    textures_path = os.path.join(project_root, "sourceimages")
+    directories = directory_tree(depth, fan_out)
+    for directory in directories:
+        os.makedirs(os.path.join(textures_path, directory), exist_ok=True)
+
+    file_count = 0
+    for material_index in range(materials):
+        name = f"asset{material_index:05d}"
+        directory = os.path.join(textures_path, rng.choice(directories))
+        tiles = [f".{1001 + tile}" for tile in range(udim_tiles)] if rng.random() < udim_fraction else [""]
+        extension = rng.choice(extensions)
+        suffixes = [suffix for suffix, chance in suffix_mix.items() if rng.random() < chance]
+        if packed_fraction and rng.random() < packed_fraction:
+            suffixes = [suffix for suffix in suffixes if suffix not in PACKED_SUFFIXES] + ["ORM"]
+
+        for suffix in suffixes:
+            header = IMAGE_HEADERS.get(extension, png_header)(size, size)
+            for tile in tiles:
+                with open(os.path.join(directory, f"{name}_{suffix}{tile}{extension}"), "wb") as image_file:
+                    image_file.write(header)
+                file_count += 1
+
+        if rng.random() < noise_fraction:
+            with open(os.path.join(directory, f"{name}_{rng.choice(NOISE_FILES)}"), "wb"):
+                pass
+            file_count += 1
+
+    # Freshly written folders would fall inside the scan cache's racy window and always be re-listed
+    timestamp = time.time() - age
+    for directory, _, files in os.walk(textures_path):
+        for file_name in files:
+            os.utime(os.path.join(directory, file_name), (timestamp, timestamp))
+    for directory in directories:
+        os.utime(os.path.join(textures_path, directory), (timestamp, timestamp))
+
+    return {"materials": materials, "files": file_count, "directories": len(directories), "root": project_root}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic sourceimages tree for the benchmarks.")
+    parser.add_argument("project_root")
+    parser.add_argument("--materials", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--udim-fraction", type=float, default=0.1)
+    parser.add_argument("--udim-tiles", type=int, default=4)
+    parser.add_argument("--packed-fraction", type=float, default=0.0)
+    parser.add_argument("--extensions", default=",".join(DEFAULT_EXTENSIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    summary = generate_sourceimages(
+        args.project_root, args.materials, args.depth, args.fan_out, extensions=args.extensions.split(","),
+        udim_fraction=args.udim_fraction, udim_tiles=args.udim_tiles, packed_fraction=args.packed_fraction, seed=args.seed
+    )
+    print(f"Wrote {summary['files']} file(s) for {summary['materials']} material(s) "
+          f"in {summary['directories']} folder(s) under {args.project_root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import builtins
+import collections
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [BENCHMARK_DIR, os.path.dirname(BENCHMARK_DIR)]
+
+import fake_maya
+import fake_qt
+from generate_sourceimages import generate_sourceimages
+
+fake_maya.install()
+fake_qt.install()
+
+import texture_search_engine as engine
+import texture_search_and_import as ui
+
+
+class SyscallCounter(object):
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+        self.originals = {}
+
+    def wrap(self, owner, name, label):
+        original = getattr(owner, name)
+        self.originals[(owner, name)] = original
+
+        def counted(*args, **kwargs):
+            with self.lock:
+                self.counts[label] += 1
+            return original(*args, **kwargs)
+        setattr(owner, name, counted)
+
+    def __enter__(self):
+        self.counts.clear()
+        # os.path.exists/isdir/getmtime all end up in os.stat
+        self.wrap(os, "stat", "stat")
+        self.wrap(os, "lstat", "stat")
+        self.wrap(os, "scandir", "scandir")
+        self.wrap(os, "listdir", "scandir")
+        self.wrap(builtins, "open", "open")
+        return self
+
+    def __exit__(self, *exc_info):
+        for (owner, name), original in self.originals.items():
+            setattr(owner, name, original)
+        self.originals.clear()
+
+
+def scan_cold(project_root):
+    cache_path = os.path.join(project_root, engine.SCAN_CACHE_NAME)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    return lambda: engine.scan_textures(project_root)
+
+
+def scan_warm(project_root):
+    engine.scan_textures(project_root)
+    return lambda: engine.scan_textures(project_root)
+
+
+def probe_cold(project_root):
+    plan = engine.scan_textures(project_root)
+    plan.scan_cache.images.clear()
+    return plan.probe
+
+
+def watch_refresh(project_root):
+    plan = engine.scan_textures(project_root)
+    folder = plan.texture_index.folders()[-1]
+    with open(os.path.join(folder, f"delivery{len(os.listdir(folder))}_BaseColor.png"), "wb"):
+        pass
+    return lambda: plan.refresh([folder])
+
+
+def build_new(project_root):
+    plan = engine.scan_textures(project_root)
+    plan.probe()
+    fake_maya.reset(project_root)
+    return lambda: engine.build(plan, "Prefix")
+
+
+def build_incremental(project_root):
+    plan = engine.scan_textures(project_root)
+    fake_maya.reset(project_root)
+    engine.build(plan, "Prefix")
+    return lambda: engine.build(plan, "Prefix")
+
+
+def build_from_library(project_root):
+    plan = engine.scan_textures(project_root)
+    plan.probe()
+    library_path = os.path.join(project_root, engine.LIBRARY_FOLDER)
+    shutil.rmtree(library_path, ignore_errors=True)
+    fake_maya.reset(project_root)
+    engine.build(plan, "Prefix", library=engine.MaterialLibrary.for_workspace(project_root))
+    fake_maya.reset(project_root)
+    return lambda: engine.build(plan, "Prefix", library=engine.MaterialLibrary.for_workspace(project_root))
+
+
+def assign_materials(project_root):
+    plan = engine.scan_textures(project_root)
+    fake_maya.reset(project_root)
+    engine.build(plan, "Prefix")
+    # A few meshes per material, named the way set dressing usually names them
+    for name in plan.names:
+        for mesh in (f"{name}_geo", f"{name}_geo_001", f"{name}_lid_geo"):
+            transform = fake_maya.scene.add_node(f"|set|{mesh}", "transform")
+            fake_maya.scene.add_node(f"{transform}|{mesh}Shape", "mesh")
+    return lambda: engine.assign_materials(plan.names, "Prefix")
+
+
+def search_button(project_root):
+    engine.scan_textures(project_root)
+    fake_maya.reset(project_root)
+    dialog = ui.ShaderCreation(None)
+    return dialog.find_possible_names
+
+
+def open_dialog_first(project_root):
+    ui.shader_creation_dialog = None
+    return ui.open_ui
+
+
+def open_dialog_again(project_root):
+    ui.open_ui().close()
+    return ui.open_ui
+
+
+# name: setup(project_root) -> callable to time
+BENCHMARKS = collections.OrderedDict([
+    ("scan (cold cache)", scan_cold),
+    ("scan (warm cache)", scan_warm),
+    ("probe headers (cold)", probe_cold),
+    ("watch (one folder changed)", watch_refresh),
+    ("build (new scene)", build_new),
+    ("build (existing shaders)", build_incremental),
+    ("build (from library)", build_from_library),
+    ("assign materials", assign_materials),
+    ("search button (UI)", search_button),
+    ("open dialog (first)", open_dialog_first),
+    ("open dialog (again)", open_dialog_again),
+])
+
+
+def run_benchmark(name, setup, project_root, materials, repeat):
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = setup(project_root)
+            fake_maya.scene.calls.clear()
+            fake_maya.scene.api_calls.clear()
+            fake_qt.calls.clear()
+
+            with SyscallCounter() as syscalls:
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best["seconds"]:
+            cmds_calls = sum(fake_maya.scene.calls.values())
+            api_calls = sum(fake_maya.scene.api_calls.values())
+            best = {
+                "name": name,
+                "seconds": elapsed,
+                "stat": syscalls.counts["stat"],
+                "scandir": syscalls.counts["scandir"],
+                "open": syscalls.counts["open"],
+                "cmds_calls": cmds_calls,
+                "cmds_per_material": cmds_calls / float(max(1, materials)),
+                "api_per_material": api_calls / float(max(1, materials)),
+                "ui_events": sum(fake_qt.calls.values()),
+                "cmds_breakdown": dict(fake_maya.scene.calls.most_common()),
+            }
+    return best
+
+
+def print_report(results, summary):
+    print(f"{summary['materials']} material(s), {summary['files']} file(s), {summary['directories']} folder(s)")
+    header = f"{'benchmark':<26}{'ms':>10}{'stat':>8}{'scandir':>9}{'open':>7}{'cmds':>8}{'cmds/mat':>10}{'api/mat':>9}{'ui':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['name']:<26}{result['seconds'] * 1000:>10.1f}{result['stat']:>8}{result['scandir']:>9}"
+            f"{result['open']:>7}{result['cmds_calls']:>8}{result['cmds_per_material']:>10.2f}"
+            f"{result['api_per_material']:>9.1f}{result['ui_events']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the texture search and shader build without Maya.")
+    parser.add_argument("--project", help="Existing project folder with a sourceimages folder to benchmark instead")
+    parser.add_argument("--materials", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--udim-fraction", type=float, default=0.1)
+    parser.add_argument("--udim-tiles", type=int, default=4)
+    parser.add_argument("--packed-fraction", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", action="append", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    project_root = args.project or tempfile.mkdtemp(prefix="texture_search_benchmark_")
+    try:
+        if args.project:
+            plan = engine.scan_textures(project_root, use_cache=False)
+            walk = list(os.walk(os.path.join(project_root, "sourceimages")))
+            summary = {
+                "materials": len(plan.names), "files": sum(len(files) for _, _, files in walk),
+                "directories": len(walk), "root": project_root
+            }
+        else:
+            summary = generate_sourceimages(
+                project_root, args.materials, args.depth, args.fan_out, udim_fraction=args.udim_fraction,
+                udim_tiles=args.udim_tiles, packed_fraction=args.packed_fraction
+            )
+
+        results = [
+            run_benchmark(name, setup, project_root, summary["materials"], max(1, args.repeat))
+            for name, setup in BENCHMARKS.items()
+            if not args.only or any(text in name for text in args.only)
+        ]
+        print_report(results, summary)
+
+        if args.json:
+            with open(args.json, "w") as json_file:
+                json.dump({"summary": summary, "results": results}, json_file, indent=2)
+    finally:
+        if not args.project:
+            shutil.rmtree(project_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
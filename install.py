@@ -3,6 +3,8 @@ import shutil
 import maya.cmds as cmds
 import maya.mel as mel
 
+TOOL_MODULES = ["texture_search_and_import.py", "texture_search_engine.py", "texture_search_images.py", "texture_search_batch.py"]
+
 def onMayaDroppedPythonFile(*args, **kwargs):
     _onMayaDropped()  
 
@@ -24,14 +26,16 @@ def _onMayaDropped():
     
     source_path = os.path.dirname(__file__)  
     scripts_dir = get_maya_prefs_scripts_dir()
-    tool_name = "texture_search_and_import.py"
-    target_path = os.path.join(scripts_dir, tool_name)
+    # The modules import each other, so every install replaces all of them to keep them at the same version
+    for tool_name in TOOL_MODULES:
+        target_path = os.path.join(scripts_dir, tool_name)
+        updated = os.path.exists(target_path)
 
-    if not os.path.exists(target_path):
         shutil.copy2(os.path.join(source_path, tool_name), target_path)
-        print(f"Tool installed to {target_path}")
-    else:
-        print(f"Tool already exists in {scripts_dir}.")
+        if updated:
+            print(f"Tool updated in {target_path}")
+        else:
+            print(f"Tool installed to {target_path}")
 
     for img_name in ["texture_import_shelf_icon.svg", "texture_import_shelf_icon.svg"]:
         source_img_path = os.path.join(source_path, img_name)
@@ -1,16 +1,20 @@
 from PySide2 import QtCore
+from PySide2 import QtGui
 from PySide2 import QtWidgets
-from shiboken2 import wrapInstance
+from shiboken2 import wrapInstance, isValid
 
 import maya.api.OpenMaya as om
 import maya.cmds as cmds
 
+import re
 import time
-
-import os
+from collections import Counter
 
 import maya.OpenMayaUI as omui1
 
+import texture_search_engine as engine
+import texture_search_images as images
+
 def maya_main_window():
     main_window_ptr = omui1.MQtUtil.mainWindow()
     
@@ -27,10 +31,143 @@ class MyLineEdit(QtWidgets.QLineEdit):
             self.enter_pressed.emit("Enter Key Pressed")
 
 
+class ScanSignals(QtCore.QObject):
+    
+    names_found = QtCore.Signal(list)
+    finished = QtCore.Signal(object)
+
+
+class ScanWorker(QtCore.QRunnable):
+    
+    def __init__(self, root, conventions, stats=None):
+        super(ScanWorker, self).__init__()
+        self.setAutoDelete(False)
+        
+        self.root = root
+        self.conventions = conventions
+        self.stats = stats if stats is not None else engine.RunStats()
+        self.cancelled = False
+        self.signals = ScanSignals()
+        
+    def run(self):
+        plan = engine.scan_textures(
+            self.root, self.conventions, on_names=self.names_found, is_cancelled=self.is_cancelled, stats=self.stats
+        )
+        self.signals.finished.emit(None if self.cancelled else plan)
+        
+    def names_found(self, names):
+        self.stats.count("name updates sent")
+        self.signals.names_found.emit(names)
+        
+    def is_cancelled(self):
+        return self.cancelled
+        
+    def cancel(self):
+        self.cancelled = True
+
+
+class BatchProgress(object):
+    
+    # Repaint at most this often, pumping events for every material costs more than building it
+    UPDATE_INTERVAL = 0.1
+    
+    def __init__(self, maximum, parent=None, stats=None):
+        self.stats = stats if stats is not None else engine.RunStats()
+        
+        self.progress_dialog = QtWidgets.QProgressDialog("Waiting to process...", "Cancel", 0, maximum, parent)
+        self.progress_dialog.setWindowTitle("Progress...")
+        self.progress_dialog.setValue(0)
+        self.progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        self.progress_dialog.show()
+        
+        self.process_events()
+        self.last_update = time.perf_counter()
+        
+    def __call__(self, label, value, maximum):
+        now = time.perf_counter()
+        if now - self.last_update >= self.UPDATE_INTERVAL or value == maximum:
+            self.last_update = now
+            self.progress_dialog.setLabelText(label)
+            self.progress_dialog.setValue(value)
+            self.process_events()
+        
+        return not self.progress_dialog.wasCanceled()
+    
+    def process_events(self):
+        start = time.perf_counter()
+        QtCore.QCoreApplication.processEvents()
+        self.stats.add_time("ui repaint", time.perf_counter() - start)
+        self.stats.count("ui events pumped")
+    
+    def close(self):
+        self.progress_dialog.close()
+
+
+class TextureWatcher(QtCore.QObject):
+    
+    # Exporters write a texture set file by file, so changes are gathered until the folders go quiet
+    DEBOUNCE_MSECS = 1000
+    
+    def __init__(self, plan, apply_changes, parent=None):
+        super(TextureWatcher, self).__init__(parent)
+        self.plan = plan
+        self.apply_changes = apply_changes
+        self.pending = set()
+        self.deferred = False
+        
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.DEBOUNCE_MSECS)
+        
+        self.watcher.directoryChanged.connect(self.folder_changed)
+        self.timer.timeout.connect(self.schedule)
+        plan.texture_index.index_folders()
+        self.watch(plan.texture_index.folders())
+        
+    def watch(self, folders):
+        if not folders:
+            return
+        failed = self.watcher.addPaths(folders)
+        if failed:
+            om.MGlobal.displayWarning(f"Could not watch {len(failed)} folder(s) in {self.plan.textures_path}, changes there are only picked up by Search.")
+        
+    def folder_changed(self, folder):
+        self.pending.add(folder)
+        self.timer.start()
+        
+    def schedule(self):
+        # Applied once Maya is idle, so a burst of deliveries turns into one update and one undo step
+        if self.pending and not self.deferred:
+            self.deferred = True
+            cmds.evalDeferred(self.apply_pending, lowestPriority=True)
+    
+    def apply_pending(self):
+        self.deferred = False
+        folders, self.pending = self.pending, set()
+        if not folders:
+            return
+        
+        changes = self.plan.refresh(folders)
+        if changes["removed_folders"]:
+            self.watcher.removePaths([folder for folder in changes["removed_folders"] if folder in self.watcher.directories()])
+        self.watch(changes["added_folders"])
+        if changes["changed"]:
+            self.apply_changes(changes["changed"])
+            
+    def stop(self):
+        self.timer.stop()
+        self.pending = set()
+        folders = self.watcher.directories()
+        if folders:
+            self.watcher.removePaths(folders)
+
+
 class ShaderCreation(QtWidgets.QDialog):
     
-    def __init__(self, parent=maya_main_window()):
-        super(ShaderCreation, self).__init__(parent)
+    def __init__(self, parent=None):
+        # Looked up per dialog, not as a default argument, so importing the module never touches Maya's UI
+        super(ShaderCreation, self).__init__(parent or maya_main_window())
         
         self.setWindowTitle("Create Shaders from Textures by MoisesCG")
         self.setMinimumWidth(200)
@@ -44,6 +181,10 @@ class ShaderCreation(QtWidgets.QDialog):
         self.apply_styles() 
         
         self.possible_names = []
+        self.plan = None
+        self.stats = engine.RunStats()
+        self.report_dialog = None
+        self.texture_watcher = None
         
         
     def create_widgets(self):
@@ -60,16 +201,8 @@ class ShaderCreation(QtWidgets.QDialog):
         
         self.toggle_button = QtWidgets.QToolButton(text="Modify Naming Conventions")
         self.toggle_button.setCheckable(True)
-        self.toggle_button.setChecked(True)
-
-        
-        self.base_color_lineedit = QtWidgets.QLineEdit("BaseColor")
-        self.roughness_lineedit = QtWidgets.QLineEdit("Roughness")
-        self.metalic_lineedit = QtWidgets.QLineEdit("Metallic")
-        self.transmission_lineedit = QtWidgets.QLineEdit("Transmission")
-        self.normal_lineedit = QtWidgets.QLineEdit("Normal")
-        self.displacement_lineedit = QtWidgets.QLineEdit("Height")
-        self.ambientoclusion_lineedit = QtWidgets.QLineEdit("AO")
+        self.toggle_button.setChecked(False)
+        self.naming_group = None
         
         self.naming_mode = QtWidgets.QComboBox()
         self.naming_mode.addItems(["Prefix", "Suffix"])
@@ -77,11 +210,43 @@ class ShaderCreation(QtWidgets.QDialog):
         self.preview_label = QtWidgets.QLabel("mtl_'name'")
         self.preview_label_two = QtWidgets.QLabel("sG_'name'")
         
+        self.shared_place2d_checkbox = QtWidgets.QCheckBox("Share one place2dTexture per material")
+        self.shared_place2d_checkbox.setChecked(True)
+        self.incremental_checkbox = QtWidgets.QCheckBox("Only update what changed in existing shaders")
+        self.incremental_checkbox.setChecked(True)
+        self.reuse_files_checkbox = QtWidgets.QCheckBox("Reuse file nodes that already read the same texture")
+        self.reuse_files_checkbox.setChecked(True)
+        self.share_duplicates_checkbox = QtWidgets.QCheckBox("Share file nodes between byte-identical textures")
+        self.share_duplicates_checkbox.setChecked(True)
+        self.library_checkbox = QtWidgets.QCheckBox(f"Import unchanged networks from {engine.LIBRARY_FOLDER}")
+        self.watch_checkbox = QtWidgets.QCheckBox("Watch sourceimages and hot-link new textures")
+        self.use_tx_checkbox = QtWidgets.QCheckBox("Use mipmapped .tx textures")
+        self.tx_converter_lineedit = QtWidgets.QLineEdit(engine.TX_CONVERTER)
+        self.proxy_checkbox = QtWidgets.QCheckBox("Generate viewport proxies and load them")
+        self.proxy_size_combo = QtWidgets.QComboBox()
+        self.proxy_size_combo.addItems([str(size) for size in engine.PROXY_SIZES])
+        self.proxy_size_combo.setCurrentText(str(engine.PROXY_SIZE))
+        self.proxy_btn = QtWidgets.QPushButton("Use Proxies")
+        self.full_res_btn = QtWidgets.QPushButton("Use Full Resolution")
+        self.assign_checkbox = QtWidgets.QCheckBox("Assign the materials to meshes with matching names")
+        self.assign_rules_combo = QtWidgets.QComboBox()
+        self.assign_rules_combo.addItems([
+            ", ".join(engine.ASSIGN_RULE_CHOICES[:count]) for count in range(1, len(engine.ASSIGN_RULE_CHOICES) + 1)
+        ])
+        self.assign_rules_combo.setCurrentText(", ".join(engine.ASSIGN_RULES))
+        self.assign_ignore_lineedit = QtWidgets.QLineEdit(", ".join(engine.ASSIGN_IGNORED_TOKENS))
+        self.preview_assign_btn = QtWidgets.QPushButton("Preview Assignment")
+        self.assign_btn = QtWidgets.QPushButton("Assign Now")
+        self.stats_json_checkbox = QtWidgets.QCheckBox(f"Save timings to {engine.STATS_FOLDER} in the project")
+        self.profile_checkbox = QtWidgets.QCheckBox("Profile the run with cProfile")
+        
 
     def toggle(self):
         expanded = self.toggle_button.isChecked()
+        if expanded and self.naming_group is None:
+            self.create_naming_group()
         self.content.setVisible(expanded)
-        self.toggle_button.setArrowType(2 if expanded else 1)
+        self.toggle_button.setArrowType(QtCore.Qt.DownArrow if expanded else QtCore.Qt.RightArrow)
         
 
     def create_layouts(self):
@@ -140,14 +305,73 @@ class ShaderCreation(QtWidgets.QDialog):
 
         main_layout.addWidget(naming_mode_group)
         
+        options_group = QtWidgets.QGroupBox("Build Options")
+        options_layout = QtWidgets.QFormLayout()
+        options_layout.setContentsMargins(10, 25, 10, 10)
+        
+        options_layout.addRow(self.shared_place2d_checkbox)
+        options_layout.addRow(self.incremental_checkbox)
+        options_layout.addRow(self.reuse_files_checkbox)
+        options_layout.addRow(self.share_duplicates_checkbox)
+        options_layout.addRow(self.library_checkbox)
+        options_layout.addRow(self.watch_checkbox)
+        options_layout.addRow(self.use_tx_checkbox)
+        options_layout.addRow("Converter:", self.tx_converter_lineedit)
+        options_layout.addRow(self.proxy_checkbox)
+        proxy_layout = QtWidgets.QHBoxLayout()
+        proxy_layout.addWidget(self.proxy_size_combo)
+        proxy_layout.addWidget(self.proxy_btn)
+        proxy_layout.addWidget(self.full_res_btn)
+        options_layout.addRow("Proxy size:", proxy_layout)
+        options_layout.addRow(self.assign_checkbox)
+        assign_layout = QtWidgets.QHBoxLayout()
+        assign_layout.addWidget(self.assign_rules_combo)
+        assign_layout.addWidget(self.preview_assign_btn)
+        assign_layout.addWidget(self.assign_btn)
+        options_layout.addRow("Match rules:", assign_layout)
+        options_layout.addRow("Ignore tokens:", self.assign_ignore_lineedit)
+        options_layout.addRow(self.stats_json_checkbox)
+        options_layout.addRow(self.profile_checkbox)
+        
+        options_group.setLayout(options_layout)
+        options_group.setStyleSheet("""
+            font-size: 16px; padding: 10px;
+            QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top left; padding-bottom: 8px; }
+        """)
+        
+        main_layout.addWidget(options_group)
+        
         self.content = QtWidgets.QWidget()
         
         main_layout.addWidget(self.toggle_button)
         
         self.content_layout = QtWidgets.QVBoxLayout(self.content)
         self.content.setLayout(self.content_layout)
-
-        naming_group = QtWidgets.QGroupBox("Modify Naming Conventions")
+        self.content.setVisible(False)
+        
+        main_layout.addWidget(self.content)
+        
+        btn_layout = QtWidgets.QHBoxLayout()
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.ok_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        
+        main_layout.addStretch()
+        main_layout.addLayout(btn_layout)
+        
+    def create_naming_group(self):
+        # Built the first time it is expanded, most sessions never change the conventions
+        self.base_color_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["base_color"])
+        self.roughness_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["roughness"])
+        self.metalic_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["metalness"])
+        self.transmission_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["transmission"])
+        self.normal_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["normal"])
+        self.displacement_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["displacement"])
+        self.ambientoclusion_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["ambient_occlusion"])
+        self.packed_orm_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["packed_orm"])
+        self.packed_arm_lineedit = QtWidgets.QLineEdit(engine.DEFAULT_CONVENTIONS["packed_arm"])
+        
+        self.naming_group = QtWidgets.QGroupBox("Modify Naming Conventions")
         naming_layout = QtWidgets.QFormLayout()
         naming_layout.setContentsMargins(10, 25, 10, 10)
         
@@ -158,256 +382,204 @@ class ShaderCreation(QtWidgets.QDialog):
         naming_layout.addRow("Normal:", self.normal_lineedit)
         naming_layout.addRow("Displacement:", self.displacement_lineedit)
         naming_layout.addRow("Ambient Occlusion:", self.ambientoclusion_lineedit)
+        naming_layout.addRow("Packed AO/Rough/Metal:", self.packed_orm_lineedit)
+        naming_layout.addRow("Packed AO/Rough/Metal (alt):", self.packed_arm_lineedit)
         
-        naming_group.setLayout(naming_layout)
-        naming_group.setStyleSheet("""
+        self.naming_group.setLayout(naming_layout)
+        self.naming_group.setStyleSheet("""
             font-size: 16px; padding: 10px;
             QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top left; padding-bottom: 8px; }
         """)
         
-        self.content_layout.addWidget(naming_group)
+        self.content_layout.addWidget(self.naming_group)
         
+    def find_possible_names(self):
+        self.possible_names = []
+        self.plan = None
         
-        main_layout.addWidget(self.content)
+        root = cmds.workspace(q=True, rootDirectory=True)
+        self.stats = engine.RunStats.for_project(
+            root, self.stats_json_checkbox.isChecked(), self.profile_checkbox.isChecked()
+        )
         
-        btn_layout = QtWidgets.QHBoxLayout()
-        btn_layout.addStretch()
-        btn_layout.addWidget(self.ok_btn)
-        btn_layout.addWidget(self.cancel_btn)
+        # The crawl runs on a worker thread, only the node creation stays on Maya's main thread
+        self.scan_worker = ScanWorker(root, self.conventions(), self.stats)
+        names_dialog = PossibleNamesUI([], scanning=True)
         
-        main_layout.addStretch()
-        main_layout.addLayout(btn_layout)
+        self.scan_worker.signals.names_found.connect(names_dialog.add_names)
+        self.scan_worker.signals.finished.connect(self.scan_finished)
+        self.scan_worker.signals.finished.connect(names_dialog.scan_finished)
+        names_dialog.rejected.connect(self.scan_worker.cancel)
         
-    def find_possible_names(self):
-        self.possible_names = []
+        QtCore.QThreadPool.globalInstance().start(self.scan_worker)
+        self.possible_names = names_dialog.exec_()
         
-        suffixes_list = [
-            self.base_color_lineedit.text(),
-            self.roughness_lineedit.text(),
-            self.metalic_lineedit.text(),
-            self.transmission_lineedit.text(),
-            self.normal_lineedit.text(),
-            self.displacement_lineedit.text(),
-            self.ambientoclusion_lineedit.text()
-        ]
+        if self.possible_names and self.plan:
+            self.create_shaders(self.possible_names)
+        elif self.plan and not self.plan.names:
+            om.MGlobal.displayWarning("No valid textures found in sourceimages.")
         
-        project_path = cmds.workspace(q=True, rootDirectory=True) 
-        textures_path = os.path.join(project_path, "sourceimages") 
-        
-        possible_extensions = [".png", ".jpg", ".jpeg", ".tga", ".exr", ".tiff"]
-        
-        for suffix_test in suffixes_list:
-        
-            for root, _, files in os.walk(textures_path):  
-                for file in files:
-                    file_name, ext = os.path.splitext(file)
-                    if ext.lower() not in possible_extensions:
-                        continue  
-
-                    for suffix in suffixes_list:
-                        if file_name.endswith(f"_{suffix}") or file_name.endswith(f"_{suffix}.1001"):
-                            if file_name.endswith(".1001"):
-                                possible_name_no_suffix = file_name.replace(f"_{suffix}.1001", "")
-                            else:
-                                possible_name_no_suffix = file_name.replace(f"_{suffix}", "")
-                            
-                            if possible_name_no_suffix not in self.possible_names:
-                                self.possible_names.append(possible_name_no_suffix)
-                            break  
-                            
+        if self.plan:
+            self.stats.report()
             
-        if self.possible_names:
-            print(self.possible_names)
-            self.possible_names = PossibleNamesUI(self.possible_names).exec_()
-            for name in self.possible_names:
-                self.create_shaders(name)
-                
-
-        if not self.possible_names:
-            om.MGlobal.displayWarning("No valid textures found in sourceimages.")
-            return
+    def scan_finished(self, plan):
+        self.plan = plan
+        if plan:
+            engine.report_scan(plan)
+            if self.texture_watcher:
+                self.start_watching()
+    
+    def toggle_watch(self, checked):
+        if checked:
+            self.start_watching()
+        else:
+            self.stop_watching()
+    
+    def current_plan(self):
+        if self.plan is None:
+            # Warm from the scan cache, this only lists the folders that changed since the last search
+            self.plan = engine.scan(cmds.workspace(q=True, rootDirectory=True), self.conventions())
+        return self.plan
+    
+    def start_watching(self):
+        self.stop_watching()
+        self.current_plan()
+        self.texture_watcher = TextureWatcher(self.plan, self.apply_texture_changes, self)
+        om.MGlobal.displayInfo(f"Watching {len(self.plan.texture_index.folders())} folder(s) in {self.plan.textures_path}.")
+    
+    def stop_watching(self):
+        if self.texture_watcher:
+            self.texture_watcher.stop()
+            self.texture_watcher.deleteLater()
+            self.texture_watcher = None
+    
+    def apply_texture_changes(self, changed):
+        stats = engine.RunStats()
+        results, new_names = engine.update_changed_shaders(
+            self.plan, changed, self.naming_mode.currentText(), self.shared_place2d_checkbox.isChecked(),
+            self.use_tx_checkbox.isChecked(), self.reuse_files_checkbox.isChecked(), stats,
+            self.share_duplicates_checkbox.isChecked()
+        )
+        
+        updated = Counter(status for result in results for status, _, _ in result["report"])
+        om.MGlobal.displayInfo(
+            f"Watch: {len(changed)} map(s) changed, {updated['Connected'] + updated['Reused']} connected and "
+            f"{updated['Retargeted']} retargeted on {len(results)} material(s)."
+        )
+        if new_names:
+            om.MGlobal.displayInfo(f"Watch: new texture set(s) without a material yet, use Search to create them: {', '.join(new_names)}")
+
+    def conventions(self):
+        if self.naming_group is None:
+            return dict(engine.DEFAULT_CONVENTIONS)
+        
+        return {
+            "base_color": self.base_color_lineedit.text(),
+            "roughness": self.roughness_lineedit.text(),
+            "metalness": self.metalic_lineedit.text(),
+            "transmission": self.transmission_lineedit.text(),
+            "normal": self.normal_lineedit.text(),
+            "displacement": self.displacement_lineedit.text(),
+            "ambient_occlusion": self.ambientoclusion_lineedit.text(),
+            "packed_orm": self.packed_orm_lineedit.text(),
+            "packed_arm": self.packed_arm_lineedit.text()
+        }
 
     def create_connections(self):
         self.ok_btn.clicked.connect(self.find_possible_names)
         self.cancel_btn.clicked.connect(self.close)
         self.toggle_button.clicked.connect(self.toggle)
         self.naming_mode.currentTextChanged.connect(self.update_preview)
-
-    def create_shaders(self, name):
-        if not name.strip():
-            om.MGlobal.displayError("No valid name provided for the shader.")
-            return None
+        self.watch_checkbox.toggled.connect(self.toggle_watch)
+        self.reuse_files_checkbox.toggled.connect(self.share_duplicates_checkbox.setEnabled)
+        self.proxy_btn.clicked.connect(self.use_proxies)
+        self.full_res_btn.clicked.connect(self.use_full_resolution)
+        self.preview_assign_btn.clicked.connect(self.preview_assignment)
+        self.assign_btn.clicked.connect(self.assign_now)
+
+    def create_shaders(self, names):
+        use_tx = self.use_tx_checkbox.isChecked()
+        if use_tx and not self.convert_textures(names):
+            return []
+        use_proxies = self.proxy_checkbox.isChecked()
+        if use_proxies and not self.generate_proxies(names):
+            return []
         
-        if self.naming_mode.currentText() == "Prefix":
-            material_name = f"mtl_{name}"
-            shading_group_name = f"sG_{name}"
-        elif self.naming_mode.currentText() == "Suffix":
-            material_name = f"{name}_mtl"
-            shading_group_name = f"{name}_sG"
-
-        if not cmds.objExists(material_name):
-            material = cmds.shadingNode("aiStandardSurface", asShader=True, name=material_name)
-        else:
-            material = material_name
-            om.MGlobal.displayWarning(f"Material '{material_name}' already exists. Using existing one.")
-
-        if not cmds.objExists(shading_group_name):
-            shading_group = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=shading_group_name)
-        else:
-            shading_group = shading_group_name
-            om.MGlobal.displayWarning(f"Shading Group '{shading_group_name}' already exists. Using existing one.")
-
-        cmds.connectAttr(f"{material}.outColor", f"{shading_group}.surfaceShader", force=True)
+        progress = BatchProgress(len(names), self, self.stats)
+        library = engine.MaterialLibrary.for_workspace(self.plan.project_path) if self.library_checkbox.isChecked() else None
         
-        self.search_existing_textures(name, material, shading_group)
-
-        om.MGlobal.displayInfo(f"Created Material: {material_name}, Shading Group: {shading_group_name}")
-        return {"material": material, "shading_group": shading_group}
+        results = engine.build(
+            self.plan, self.naming_mode.currentText(), names, progress, self.shared_place2d_checkbox.isChecked(), use_tx,
+            incremental=self.incremental_checkbox.isChecked(), reuse_files=self.reuse_files_checkbox.isChecked(),
+            stats=self.stats, library=library, share_duplicates=self.share_duplicates_checkbox.isChecked()
+        )
         
+        progress.close()
         
-    def search_existing_textures(self, name, material, shading_group):
-        project_path = cmds.workspace(q=True, rootDirectory=True)  
-        textures_path = os.path.join(project_path, "sourceimages")  
-
-        if not os.path.exists(textures_path):
-            om.MGlobal.displayWarning("The sourceimages folder does not exist in the current project.")
-            return
-
-        texture_map = {
-            self.base_color_lineedit.text(): ("baseColor", False, False), 
-            self.roughness_lineedit.text(): ("specularRoughness", True, True),  
-            self.metalic_lineedit.text(): ("metalness", True, True),  
-            self.transmission_lineedit.text(): ("transmission", True, True),  
-            self.normal_lineedit.text(): ("normalCamera", False, False),
-            self.displacement_lineedit.text(): ("displacementShader", True, True),  
-            self.ambientoclusion_lineedit.text(): ("ambientOcclusion", True, True)  
-        }
-
-        possible_extensions = [".png", ".jpg", ".jpeg", ".tga", ".exr", ".tiff"]
-        connection_list = []
-        no_texture_found_list = []
+        if results and use_proxies:
+            engine.set_proxy_paths(self.plan, True, self.proxy_size(), use_tx, self.stats)
+        assignments = None
+        if results and self.assign_checkbox.isChecked():
+            assignments = self.assign_materials([result["name"] for result in results])
+        if results:
+            with self.stats.phase("report"):
+                self.show_report(results, assignments)
+        return results
+    
+    def convert_textures(self, names):
+        sources = engine.stale_tx_sources(self.plan, names)
+        if not sources:
+            return True
         
-        number_of_operations = len(texture_map)  
-        progress_dialog = QtWidgets.QProgressDialog("Waiting to process...", "Cancel", 0, number_of_operations, self)
-        progress_dialog.setWindowTitle("Progress...")
-        progress_dialog.setValue(0)
-        progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
-        progress_dialog.show()
-
-        QtCore.QCoreApplication.processEvents()
+        progress = BatchProgress(len(sources), self, self.stats)
+        with self.stats.phase("convert tx"):
+            result = engine.convert_tx(sources, self.tx_converter_lineedit.text(), progress=progress)
+        progress.close()
         
-        texture_has_udims = False
-
-        for i, (suffix, (attr, is_raw, use_red_channel)) in enumerate(texture_map.items(), start=1):
-            texture_file = None
-
-            for root, _, files in os.walk(textures_path): 
-                for ext in possible_extensions:
-                    texture_path = os.path.join(root, f"{name}_{suffix}{ext}")
-
-                    if os.path.exists(texture_path):
-                        texture_file = texture_path
-                        break
-                    else:
-                        udim_texture_path = os.path.join(root, f"{name}_{suffix}.1001{ext}")
-                        if os.path.exists(udim_texture_path):
-                            texture_file = udim_texture_path
-                            texture_has_udims = True  
-                            break
-                
-                if texture_file: 
-                    break
-
-
-            if not texture_file:
-                no_texture_found_list.append(f"No texture found for {suffix} or it isn't named as: {name}_{suffix}' in sourceimages.")
-                continue  
-                
-            if progress_dialog.wasCanceled():
-                break
-                
-            progress_dialog.setLabelText(f"Processing: {suffix} ({i}/{number_of_operations})")
-            progress_dialog.setValue(i)
-            QtCore.QCoreApplication.processEvents()  
-
-
-            file_node = cmds.shadingNode("file", asTexture=True, name=f"{name}_{suffix}_file")
-            cmds.setAttr(f"{file_node}.fileTextureName", texture_file, type="string")
-
-            if is_raw:
-                cmds.setAttr(f"{file_node}.colorSpace", "Raw", type="string")
-                cmds.setAttr(f"{file_node}.alphaIsLuminance", 1)
-            
-            if texture_has_udims:
-                cmds.setAttr(f"{file_node}.uvTilingMode", 3)
-
-            place2d = cmds.shadingNode("place2dTexture", asUtility=True, name=f"{name}_{suffix}_place2d")
-            cmds.connectAttr(f"{place2d}.outUV", f"{file_node}.uvCoord", force=True)
-            cmds.connectAttr(f"{place2d}.outUvFilterSize", f"{file_node}.uvFilterSize", force=True)
-
-            cmds.connectAttr(f"{place2d}.coverage", f"{file_node}.coverage")
-            cmds.connectAttr(f"{place2d}.translateFrame", f"{file_node}.translateFrame")
-            cmds.connectAttr(f"{place2d}.rotateFrame", f"{file_node}.rotateFrame")
-            cmds.connectAttr(f"{place2d}.mirrorU", f"{file_node}.mirrorU")
-            cmds.connectAttr(f"{place2d}.mirrorV", f"{file_node}.mirrorV")
-            cmds.connectAttr(f"{place2d}.stagger", f"{file_node}.stagger")
-            cmds.connectAttr(f"{place2d}.wrapU", f"{file_node}.wrapU")
-            cmds.connectAttr(f"{place2d}.wrapV", f"{file_node}.wrapV")
-            cmds.connectAttr(f"{place2d}.repeatUV", f"{file_node}.repeatUV")
-            cmds.connectAttr(f"{place2d}.offset", f"{file_node}.offset")
-            cmds.connectAttr(f"{place2d}.rotateUV", f"{file_node}.rotateUV")
-            cmds.connectAttr(f"{place2d}.noiseUV", f"{file_node}.noiseUV")
-
-            
-
-            output_attr = "outColor" if not use_red_channel else "outColorR"
-
-
-
-            if suffix == self.normal_lineedit.text():
-                normal_node = cmds.shadingNode("aiNormalMap", asUtility=True, name=f"{name}_normalMap")
-                cmds.connectAttr(f"{file_node}.outColor", f"{normal_node}.input", force=True)
-                cmds.connectAttr(f"{normal_node}.outValue", f"{material}.normalCamera", force=True)
-
-            elif suffix == self.displacement_lineedit.text():
-                displacement_node = cmds.shadingNode("displacementShader", asShader=True, name=f"{name}_displacement")
-                
-                subtract_node = cmds.shadingNode("aiSubtract", asUtility=True, name=f"{name}_subtract")
-                cmds.setAttr(f"{subtract_node}.input2R", 0.5)
-                cmds.setAttr(f"{subtract_node}.input2G", 0.5)
-                cmds.setAttr(f"{subtract_node}.input2B", 0.5)
-                
-                multiply_node = cmds.shadingNode("aiMultiply", asUtility=True, name=f"{name}_multiply")
-                cmds.setAttr(f"{multiply_node}.input2R", 1.0)
-                cmds.setAttr(f"{multiply_node}.input2G", 1.0)
-                cmds.setAttr(f"{multiply_node}.input2B", 1.0)
-                
-                cmds.connectAttr(f"{file_node}.outColor", f"{subtract_node}.input1", force=True)
-                cmds.connectAttr(f"{subtract_node}.outColor", f"{multiply_node}.input1", force=True)
-                cmds.connectAttr(f"{multiply_node}.outColor", f"{displacement_node}.vectorDisplacement", force=True)
-                cmds.connectAttr(f"{displacement_node}.displacement", f"{shading_group}.displacementShader", force=True)
-            elif suffix ==  self.base_color_lineedit.text():
-                color_correct = cmds.shadingNode("aiColorCorrect", asUtility=True, name=f"{name}_{suffix}_colorCorrect")
-                cmds.connectAttr(f"{file_node}.{output_attr}", f"{color_correct}.input", force=True)
-                cmds.connectAttr(f"{color_correct}.outColor", f"{material}.{attr}", force=True)
-            elif suffix == self.roughness_lineedit.text():
-                cmds.setAttr(f"{file_node}.alphaIsLuminance", 0)
-                color_correct_rough = cmds.shadingNode("aiColorCorrect", asUtility=True, name=f"{name}_{suffix}_colorCorrect")
-                cmds.connectAttr(f"{file_node}.outColor", f"{color_correct_rough}.input", force=True)
-                cmds.connectAttr(f"{color_correct_rough}.outColorR", f"{material}.{attr}", force=True)
-            else:
-                
-                cmds.connectAttr(f"{file_node}.outAlpha", f"{material}.{attr}", force=True)
-                
-            
-
-            om.MGlobal.displayInfo(f"Connected {texture_file} to {material}.{attr} using {file_node}.{output_attr}")
-            connection_list.append(f"Connected {name}_{suffix}{ext} to {material}'s {attr}")
-            time.sleep(0.05)
-
-        progress_dialog.close()
+        engine.report_tx_conversion(result)
+        if result["cancelled"]:
+            om.MGlobal.displayWarning("Texture conversion cancelled, no shaders were created.")
+        return not result["cancelled"]
+    
+    def proxy_size(self):
+        return int(self.proxy_size_combo.currentText())
+    
+    def generate_proxies(self, names=None):
+        jobs = engine.stale_proxy_jobs(self.plan, names, self.proxy_size())
+        if not jobs:
+            return True
+        
+        progress = BatchProgress(len(jobs), self, self.stats)
+        with self.stats.phase("generate proxies"):
+            result = images.make_proxies(jobs, self.proxy_size(), progress=progress)
+        progress.close()
         
-        self.show_connection_dialog(connection_list, no_texture_found_list)
+        engine.report_proxies(result)
+        if result["cancelled"]:
+            om.MGlobal.displayWarning("Proxy generation cancelled.")
+        return not result["cancelled"]
+    
+    def use_proxies(self):
+        self.current_plan()
+        if self.generate_proxies():
+            engine.set_proxy_paths(self.plan, True, self.proxy_size(), self.use_tx_checkbox.isChecked())
+    
+    def use_full_resolution(self):
+        engine.set_proxy_paths(self.current_plan(), False, self.proxy_size(), self.use_tx_checkbox.isChecked())
+    
+    def assign_materials(self, names=None, dry_run=False):
+        rules = [rule.strip() for rule in self.assign_rules_combo.currentText().split(",")]
+        ignored_tokens = [token.strip() for token in self.assign_ignore_lineedit.text().split(",") if token.strip()]
+        names = self.current_plan().names if names is None else names
+        return engine.assign_materials(
+            names, self.naming_mode.currentText(), rules, ignored_tokens, dry_run=dry_run, stats=self.stats
+        )
+    
+    def preview_assignment(self):
+        self.show_report([], self.assign_materials(dry_run=True))
+    
+    def assign_now(self):
+        self.show_report([], self.assign_materials())
     
     def apply_styles(self):
         self.setStyleSheet("""
@@ -492,92 +664,421 @@ class ShaderCreation(QtWidgets.QDialog):
             self.preview_label.setText("'name'_mtl")
             self.preview_label_two.setText("'name'_sG")
         
-    def show_connection_dialog(self, connection_list, no_texture_found_list):
+    def show_report(self, results, assignments=None):
+        # One report for the whole batch, created on first use and refilled after every build
+        if self.report_dialog is None:
+            self.report_dialog = BatchReportUI(self)
+        self.report_dialog.set_results(results, assignments)
         
-        dialog = QtWidgets.QDialog(self)
-        dialog.setWindowTitle("Texture Connection Report")
-        dialog.setMinimumSize(550, 400)
+        if self.report_dialog.isHidden():
+            self.report_dialog.show()
+        else:
+            self.report_dialog.raise_()
+            self.report_dialog.activateWindow()
 
-        layout = QtWidgets.QVBoxLayout(dialog)
+
+class ReportModel(QtCore.QAbstractTableModel):
+    
+    HEADERS = ["Material", "Status", "Map", "Message"]
+    STATUS_COLORS = {
+        "Connected": "#85A84F",
+        "Reused": "#85A84F",
+        "Retargeted": "#3B7D91",
+        "Unchanged": "#E0E0E0",
+        "Imported": "#9370DB",
+        "Missing": "brown",
+        "Large": "#FF6347",
+        "Memory": "#F4C430",
+        "Assigned": "#85A84F",
+        "Would Assign": "#3B7D91",
+        "No Mesh": "brown",
+        "No Shader": "brown"
+    }
+    
+    def __init__(self, parent=None):
+        super(ReportModel, self).__init__(parent)
+        self.rows = []
+        self.colors = {status: QtGui.QColor(color) for status, color in self.STATUS_COLORS.items()}
         
-        title_label = QtWidgets.QLabel("Texture Connection Results")
-        title_label.setStyleSheet("font-size: 22px; font-weight: bold; color: #FFD700;") 
-        layout.addWidget(title_label)
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
         
-        scroll_area = QtWidgets.QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("background-color: #2A2A2A; border: 1px solid #444; border-radius: 5px; padding: 5px;")
+    def rowCount(self, parent=None):
+        return 0 if parent is not None and parent.isValid() else len(self.rows)
+    
+    def columnCount(self, parent=None):
+        return 0 if parent is not None and parent.isValid() else len(engine.REPORT_COLUMNS)
+    
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
         
-        scroll_widget = QtWidgets.QWidget()
-        scroll_layout = QtWidgets.QVBoxLayout(scroll_widget)
+        row = self.rows[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return row[engine.REPORT_COLUMNS[index.column()]]
+        if role == QtCore.Qt.ForegroundRole:
+            return self.colors.get(row["status"])
+        if role == QtCore.Qt.ToolTipRole:
+            return row["message"]
+        return None
+    
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        # One list.sort on the row dicts, the proxy's own sort would call data() for every comparison
+        if not 0 <= column < len(engine.REPORT_COLUMNS):
+            return
         
-        for no_texture in no_texture_found_list:
-            conn_label = QtWidgets.QLabel(no_texture)
-            conn_label.setStyleSheet(
-                "background-color: #333333; color: brown; font-size: 16px; padding: 8px; border: 1px solid #555;"
-                "border-radius: 4px; margin-bottom: 5px;"
-            )
-            conn_label.setWordWrap(True)
-            scroll_layout.addWidget(conn_label)
-            
+        key = engine.REPORT_COLUMNS[column]
+        self.beginResetModel()
+        self.rows.sort(key=lambda row: row[key].lower(), reverse=order == QtCore.Qt.DescendingOrder)
+        self.endResetModel()
+
+
+class ReportFilterModel(QtCore.QSortFilterProxyModel):
+    
+    def __init__(self, parent=None):
+        super(ReportFilterModel, self).__init__(parent)
+        self.status = ""
+        self.material_text = ""
+        
+    def set_filters(self, status, material_text):
+        self.status = status
+        self.material_text = material_text.lower()
+        self.invalidateFilter()
+        
+    def filterAcceptsRow(self, source_row, source_parent):
+        # Reads the row dict directly instead of going through data() for every column
+        row = self.sourceModel().rows[source_row]
+        if self.status and row["status"] != self.status:
+            return False
+        return self.material_text in row["material"].lower()
+    
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+class BatchReportUI(QtWidgets.QDialog):
+    
+    ALL_STATUSES = "All statuses"
+    
+    def __init__(self, parent=None):
+        super(BatchReportUI, self).__init__(parent)
+        
+        self.setWindowTitle("Texture Connection Report")
+        self.setMinimumSize(800, 500)
+        self.setWindowFlag(QtCore.Qt.WindowContextHelpButtonHint, False)
+        
+        self.model = ReportModel(self)
+        self.filter_model = ReportFilterModel(self)
+        self.filter_model.setSourceModel(self.model)
+        
+        self.create_widgets()
+        self.create_layouts()
+        self.create_connections()
+        self.apply_styles()
+        
+    def create_widgets(self):
+        self.title_label = QtWidgets.QLabel("Texture Connection Results")
+        self.summary_label = QtWidgets.QLabel()
+        self.summary_label.setWordWrap(True)
+        
+        self.status_combo = QtWidgets.QComboBox()
+        self.status_combo.addItems([self.ALL_STATUSES] + engine.REPORT_STATUSES)
+        self.material_lineedit = QtWidgets.QLineEdit()
+        self.material_lineedit.setPlaceholderText("Filter by material...")
+        
+        # Fixed row heights and no word wrap let the view lay out only the rows on screen
+        self.table_view = QtWidgets.QTableView()
+        self.table_view.setModel(self.filter_model)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.setWordWrap(False)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(24)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.setColumnWidth(0, 180)
+        self.table_view.setColumnWidth(1, 90)
+        self.table_view.setColumnWidth(2, 110)
         
-        for connection in connection_list:
-            conn_label = QtWidgets.QLabel(connection)
-            conn_label.setStyleSheet(
-                "background-color: #333333; color: #85A84F; font-size: 16px; padding: 8px; border: 1px solid #555;"
-                "border-radius: 4px; margin-bottom: 5px;"
+        self.export_csv_btn = QtWidgets.QPushButton("Export CSV")
+        self.export_json_btn = QtWidgets.QPushButton("Export JSON")
+        self.close_btn = QtWidgets.QPushButton("Close")
+        
+    def create_layouts(self):
+        main_layout = QtWidgets.QVBoxLayout(self)
+        main_layout.addWidget(self.title_label)
+        main_layout.addWidget(self.summary_label)
+        
+        filter_layout = QtWidgets.QHBoxLayout()
+        filter_layout.addWidget(self.status_combo)
+        filter_layout.addWidget(self.material_lineedit)
+        main_layout.addLayout(filter_layout)
+        
+        main_layout.addWidget(self.table_view)
+        
+        btn_layout = QtWidgets.QHBoxLayout()
+        btn_layout.addWidget(self.export_csv_btn)
+        btn_layout.addWidget(self.export_json_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.close_btn)
+        main_layout.addLayout(btn_layout)
+        
+    def create_connections(self):
+        self.status_combo.currentTextChanged.connect(self.apply_filters)
+        self.material_lineedit.textChanged.connect(self.apply_filters)
+        self.export_csv_btn.clicked.connect(lambda: self.export(".csv"))
+        self.export_json_btn.clicked.connect(lambda: self.export(".json"))
+        self.close_btn.clicked.connect(self.close)
+        
+    def set_results(self, results, assignments=None):
+        rows = engine.batch_report(results) + engine.assignment_report(assignments or [])
+        self.model.set_rows(rows)
+        header = self.table_view.horizontalHeader()
+        self.model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        
+        status_counts = Counter(row["status"] for row in rows)
+        summary = []
+        if results:
+            batch_memory = sum(result["memory"] for result in results)
+            counts = ", ".join(
+                f"{status_counts[status]} {status.lower()}" for status in engine.REPORT_STATUSES[:5] if status_counts[status]
+            )
+            summary.append(
+                f"{len(results)} material(s): {counts}. Texture memory for the batch: {images.format_bytes(batch_memory)}"
+            )
+        if assignments:
+            # Mesh rows per assignment status, names without a mesh have a single row each
+            counts = ", ".join(
+                f"{status_counts[status]} {status.lower()}" for status in engine.REPORT_STATUSES[8:] if status_counts[status]
             )
-            conn_label.setWordWrap(True)
-            scroll_layout.addWidget(conn_label)
+            summary.append(f"Assignment of {len(assignments)} material(s): {counts}.")
+        self.summary_label.setText(" ".join(summary))
+        self.apply_filters()
         
+    def apply_filters(self, *args):
+        status = self.status_combo.currentText()
+        self.filter_model.set_filters("" if status == self.ALL_STATUSES else status, self.material_lineedit.text())
         
+    def visible_rows(self):
+        return [
+            self.model.rows[self.filter_model.mapToSource(self.filter_model.index(row, 0)).row()]
+            for row in range(self.filter_model.rowCount())
+        ]
         
-        scroll_widget.setLayout(scroll_layout)
-        scroll_area.setWidget(scroll_widget)
-        layout.addWidget(scroll_area)
+    def export(self, extension):
+        file_filter = "JSON (*.json)" if extension == ".json" else "CSV (*.csv)"
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Report", f"texture_report{extension}", file_filter)
+        if not path:
+            return
         
-        close_btn = QtWidgets.QPushButton("Close")
-        close_btn.setStyleSheet(
-            "background-color: #3B7D91; color: white; font-size: 18px; padding: 8px; border-radius: 5px;"
-        )
-        close_btn.clicked.connect(dialog.accept)
+        try:
+            engine.export_report(self.visible_rows(), path)
+        except OSError as error:
+            om.MGlobal.displayWarning(f"Could not export the report: {error}")
+            return
+        om.MGlobal.displayInfo(f"Report exported to {path}")
         
-        layout.addWidget(close_btn, alignment=QtCore.Qt.AlignCenter)
+    def apply_styles(self):
+        self.title_label.setStyleSheet("font-size: 22px; font-weight: bold; color: #FFD700;")
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #2A2A2A;
+                color: white;
+            }
+            QLabel {
+                font-size: 16px;
+                color: #E0E0E0;
+            }
+            QTableView {
+                font-size: 14px;
+                background-color: #333333;
+                alternate-background-color: #3B3B3B;
+                border: 1px solid #444;
+                border-radius: 5px;
+            }
+            QPushButton {
+                padding: 8px;
+                font-size: 16px;
+                border-radius: 5px;
+                background-color: #3B7D91;
+                color: white;
+            }
+            QPushButton:hover {
+                background-color: #85A84F;
+            }
+        """)
         
-        dialog.show()
+
+class NamesModel(QtCore.QAbstractListModel):
+    
+    def __init__(self, names=None, parent=None):
+        super(NamesModel, self).__init__(parent)
+        self.names = list(names or [])
+        self.keep = [True] * len(self.names)
+        self.kept_count = len(self.names)
         
+    def rowCount(self, parent=None):
+        return 0 if parent is not None and parent.isValid() else len(self.names)
+    
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self.names[index.row()]
+        if role == QtCore.Qt.CheckStateRole:
+            return QtCore.Qt.Checked if self.keep[index.row()] else QtCore.Qt.Unchecked
+        return None
+    
+    def flags(self, index):
+        return super(NamesModel, self).flags(index) | QtCore.Qt.ItemIsUserCheckable
+    
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.CheckStateRole or not index.isValid():
+            return False
+        self.set_keep([index.row()], value == QtCore.Qt.Checked)
+        return True
+    
+    def add_names(self, names):
+        if not names:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), len(self.names), len(self.names) + len(names) - 1)
+        self.names.extend(names)
+        self.keep.extend([True] * len(names))
+        self.kept_count += len(names)
+        self.endInsertRows()
+        
+    def set_keep(self, rows, keep):
+        self.update_rows(rows, lambda row: keep)
+        
+    def invert(self, rows):
+        self.update_rows(rows, lambda row: not self.keep[row])
+        
+    def update_rows(self, rows, value):
+        # Flags change in one pass and the view gets a single dataChanged for the whole span
+        changed = []
+        for row in rows:
+            new_value = value(row)
+            if self.keep[row] != new_value:
+                self.keep[row] = new_value
+                changed.append(row)
+        if not changed:
+            return
+        
+        self.kept_count += sum(1 if self.keep[row] else -1 for row in changed)
+        self.dataChanged.emit(self.index(min(changed)), self.index(max(changed)), [QtCore.Qt.CheckStateRole])
+        
+    def kept_names(self):
+        return [name for name, keep in zip(self.names, self.keep) if keep]
+
+
+class NamesFilterModel(QtCore.QSortFilterProxyModel):
+    
+    def __init__(self, parent=None):
+        super(NamesFilterModel, self).__init__(parent)
+        self.pattern = None
+        self.text = ""
+        
+    def set_filter(self, text, use_regex=False):
+        self.text = text.lower()
+        self.pattern = None
+        if use_regex and text:
+            try:
+                self.pattern = re.compile(text, re.IGNORECASE)
+            except re.error:
+                # Half-typed expressions filter nothing until they compile
+                self.text = ""
+        self.invalidateFilter()
+        
+    def accepts(self, name):
+        if self.pattern is not None:
+            return self.pattern.search(name) is not None
+        return self.text in name.lower()
+        
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.accepts(self.sourceModel().names[source_row])
+    
+    def visible_rows(self):
+        # Same test as the view, straight over the name list instead of mapping proxy rows one by one
+        names = self.sourceModel().names
+        if not self.text and self.pattern is None:
+            return range(len(names))
+        return [row for row, name in enumerate(names) if self.accepts(name)]
+
+
 class PossibleNamesUI(QtWidgets.QDialog):
-    def __init__(self, possible_names, parent=None):
+    def __init__(self, possible_names, parent=None, scanning=False):
         super(PossibleNamesUI, self).__init__(parent)
         
         self.setWindowTitle("Select Names to Keep")
         self.setMinimumSize(500, 400)
         self.setWindowFlag(QtCore.Qt.WindowContextHelpButtonHint, False)  
 
-        self.possible_names = possible_names  
-        self.new_possible_names = list(possible_names) 
+        self.scanning = scanning
+        
+        self.names_model = NamesModel(possible_names, self)
+        self.filter_model = NamesFilterModel(self)
+        self.filter_model.setSourceModel(self.names_model)
 
         self.create_widgets()
         self.create_layouts()
         self.create_connections()
         self.apply_styles()
+        self.update_count()
 
     def create_widgets(self):
-        self.list_widget = QtWidgets.QListWidget()
-        self.list_widget.addItems(self.new_possible_names)
-        self.list_widget.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)  
-
-        self.remove_btn = QtWidgets.QPushButton("Remove Selected")
+        self.filter_lineedit = QtWidgets.QLineEdit()
+        self.filter_lineedit.setPlaceholderText("Filter names...")
+        self.regex_checkbox = QtWidgets.QCheckBox("Regex")
+        
+        self.list_view = QtWidgets.QListView()
+        self.list_view.setModel(self.filter_model)
+        # Batched layout keeps the view responsive while the scan streams in thousands of names
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QtWidgets.QListView.Batched)
+        self.list_view.setBatchSize(200)
+        self.list_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+
+        self.count_label = QtWidgets.QLabel()
+        self.status_label = QtWidgets.QLabel("Searching sourceimages..." if self.scanning else "")
+        self.status_label.setVisible(self.scanning)
+
+        self.keep_all_btn = QtWidgets.QPushButton("Keep All")
+        self.drop_all_btn = QtWidgets.QPushButton("Drop All")
+        self.invert_btn = QtWidgets.QPushButton("Invert")
+        self.remove_btn = QtWidgets.QPushButton("Drop Selected")
         self.confirm_btn = QtWidgets.QPushButton("Confirm")
+        self.confirm_btn.setEnabled(not self.scanning)
         self.close_btn = QtWidgets.QPushButton("Cancel")
 
     def create_layouts(self):
         main_layout = QtWidgets.QVBoxLayout(self)
-        main_layout.addWidget(QtWidgets.QLabel("Select names to remove:"))
-        main_layout.addWidget(self.list_widget)
+        main_layout.addWidget(QtWidgets.QLabel("Uncheck the names you don't want to create:"))
+        
+        filter_layout = QtWidgets.QHBoxLayout()
+        filter_layout.addWidget(self.filter_lineedit)
+        filter_layout.addWidget(self.regex_checkbox)
+        main_layout.addLayout(filter_layout)
+        
+        main_layout.addWidget(self.list_view)
+        main_layout.addWidget(self.count_label)
+        main_layout.addWidget(self.status_label)
+        
+        bulk_layout = QtWidgets.QHBoxLayout()
+        bulk_layout.addWidget(self.keep_all_btn)
+        bulk_layout.addWidget(self.drop_all_btn)
+        bulk_layout.addWidget(self.invert_btn)
+        bulk_layout.addWidget(self.remove_btn)
+        main_layout.addLayout(bulk_layout)
 
         btn_layout = QtWidgets.QHBoxLayout()
-        btn_layout.addWidget(self.remove_btn)
         btn_layout.addStretch()
         btn_layout.addWidget(self.confirm_btn)
         btn_layout.addWidget(self.close_btn)
@@ -585,15 +1086,48 @@ class PossibleNamesUI(QtWidgets.QDialog):
         main_layout.addLayout(btn_layout)
 
     def create_connections(self):
+        self.filter_lineedit.textChanged.connect(self.apply_filter)
+        self.regex_checkbox.toggled.connect(self.apply_filter)
+        self.keep_all_btn.clicked.connect(lambda: self.names_model.set_keep(self.filter_model.visible_rows(), True))
+        self.drop_all_btn.clicked.connect(lambda: self.names_model.set_keep(self.filter_model.visible_rows(), False))
+        self.invert_btn.clicked.connect(lambda: self.names_model.invert(self.filter_model.visible_rows()))
         self.remove_btn.clicked.connect(self.remove_selected_items)
         self.confirm_btn.clicked.connect(self.confirm_selection)
         self.close_btn.clicked.connect(self.close_clicked)
+        self.names_model.dataChanged.connect(self.update_count)
+        self.names_model.rowsInserted.connect(self.update_count)
+
+    def apply_filter(self, *args):
+        self.filter_model.set_filter(self.filter_lineedit.text(), self.regex_checkbox.isChecked())
 
     def remove_selected_items(self):
-        selected_items = self.list_widget.selectedItems()
-        for item in selected_items:
-            self.new_possible_names.remove(item.text()) 
-            self.list_widget.takeItem(self.list_widget.row(item)) 
+        # The proxy only filters, so proxy row i is the i-th visible name; selection ranges map without per-row Qt calls
+        visible_rows = self.filter_model.visible_rows()
+        rows = [
+            visible_rows[row]
+            for selection_range in self.list_view.selectionModel().selection()
+            for row in range(selection_range.top(), selection_range.bottom() + 1)
+        ]
+        self.names_model.set_keep(rows, False)
+        self.list_view.clearSelection()
+        
+    def update_count(self, *args):
+        self.count_label.setText(f"{self.names_model.kept_count} of {len(self.names_model.names)} name(s) kept")
+
+    def add_names(self, names):
+        self.names_model.add_names(names)
+        self.status_label.setText(f"Searching sourceimages... {len(self.names_model.names)} name(s) found")
+
+    def scan_finished(self, plan):
+        self.scanning = False
+        if plan is None:
+            return
+        if not plan.names:
+            self.reject()
+            return
+        
+        self.status_label.setText(f"Search finished, {len(plan.names)} name(s) found")
+        self.confirm_btn.setEnabled(True)
 
     def confirm_selection(self):
         self.accept() 
@@ -612,7 +1146,7 @@ class PossibleNamesUI(QtWidgets.QDialog):
                 font-weight: bold;
                 color: #FFD700;
             }
-            QListWidget {
+            QListView {
                 font-size: 16px;
                 border: 2px solid #D4A017;
                 background-color: #3B3B3B;
@@ -620,14 +1154,14 @@ class PossibleNamesUI(QtWidgets.QDialog):
                 border-radius: 5px;
                 outline: none;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 6px;
                 margin: 2px;
                 border-radius: 3px;
                 background-color: #4E4E4E;
                 color: white;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #FF6347;
                 color: black;
                 font-weight: bold;
@@ -650,17 +1184,23 @@ class PossibleNamesUI(QtWidgets.QDialog):
     def exec_(self):
         result = super().exec_()
         if result == QtWidgets.QDialog.Accepted:
-            return self.new_possible_names
-        else:
-            self.new_possible_names = []
-            return self.new_possible_names
-        return self.possible_names
+            return self.names_model.kept_names()
+        return []
     
 
+shader_creation_dialog = None
+
+
 def open_ui():
-    try:
-        test_dialog.close()
-    except:
-        pass
-    shader_creation_dialog = ShaderCreation()
-    shader_creation_dialog.show()
+    global shader_creation_dialog
+    
+    # One dialog per session: later shelf clicks re-show it with its settings instead of rebuilding every widget
+    if shader_creation_dialog is None or not isValid(shader_creation_dialog):
+        shader_creation_dialog = ShaderCreation()
+    
+    if shader_creation_dialog.isHidden():
+        shader_creation_dialog.show()
+    else:
+        shader_creation_dialog.raise_()
+        shader_creation_dialog.activateWindow()
+    return shader_creation_dialog
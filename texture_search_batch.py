@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import texture_search_images as images
+
+MAYAPY = os.environ.get("TEXTURE_SEARCH_MAYAPY", "mayapy")
+SCENE_NAME = "texture_search_shaders.ma"
+SCENE_EXTENSIONS = {".ma": "mayaAscii", ".mb": "mayaBinary"}
+# Maya prints plenty on its own, the worker's result is the last line starting with this
+RESULT_MARKER = "TEXTURE_SEARCH_RESULT "
+OUTPUT_TAIL = 20
+
+
+def split_command(command):
+    # A bare path with spaces, as the shell hands over --mayapy "C:\Program Files\...", is one argument
+    if os.path.isfile(command):
+        return [command]
+    return images.split_command(command)
+
+
+def find_workspace_root(scene_path):
+    folder = os.path.dirname(os.path.abspath(scene_path))
+    while True:
+        if os.path.isfile(os.path.join(folder, "workspace.mel")):
+            return folder
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            break
+        folder = parent
+
+    # Without a workspace.mel assume the usual <project>/scenes/<scene> layout
+    scene_folder = os.path.dirname(os.path.abspath(scene_path))
+    if os.path.basename(scene_folder).lower() == "scenes":
+        return os.path.dirname(scene_folder)
+    return scene_folder
+
+
+def build_project(
+    target, naming="prefix", use_tx=False, reuse_files=True, scene_name=SCENE_NAME, save_stats=False, use_library=False,
+    library_path=None, share_duplicates=True, assign=False
+):
+    # Runs inside the mayapy worker, Maya is only imported once the standalone session is up
+    import maya.cmds as cmds
+    import texture_search_engine as engine
+
+    is_scene = os.path.splitext(target)[1].lower() in SCENE_EXTENSIONS
+    root = find_workspace_root(target) if is_scene else os.path.abspath(target)
+    if not os.path.isdir(root):
+        raise RuntimeError(f"The project folder {root} does not exist.")
+
+    stats = engine.RunStats.for_project(root, write_json=save_stats)
+    with stats.phase("open scene"):
+        cmds.workspace(root, openWorkspace=True)
+        if is_scene:
+            cmds.file(target, open=True, force=True)
+        else:
+            cmds.file(new=True, force=True)
+
+    plan = engine.scan(root, stats=stats)
+    if not plan.names:
+        raise RuntimeError(f"No textures matching the naming conventions in {plan.textures_path}.")
+
+    if use_tx:
+        with stats.phase("convert tx"):
+            engine.report_tx_conversion(engine.convert_tx(engine.stale_tx_sources(plan)))
+    library = None
+    if use_library or library_path:
+        library = engine.MaterialLibrary(library_path).load() if library_path else engine.MaterialLibrary.for_workspace(root)
+    results = engine.build(
+        plan, naming, use_tx=use_tx, reuse_files=reuse_files, stats=stats, library=library, share_duplicates=share_duplicates
+    )
+    assignments = engine.assign_materials([result["name"] for result in results], naming, stats=stats) if assign else []
+
+    with stats.phase("save scene"):
+        scene_path = os.path.abspath(target) if is_scene else os.path.join(root, "scenes", scene_name)
+        if not is_scene:
+            os.makedirs(os.path.dirname(scene_path), exist_ok=True)
+            cmds.file(rename=scene_path)
+        scene_type = SCENE_EXTENSIONS.get(os.path.splitext(scene_path)[1].lower(), "mayaAscii")
+        cmds.file(save=True, force=True, type=scene_type)
+
+    if save_stats:
+        stats.save()
+
+    report = [status for result in results for status, _, _ in result["report"]]
+    run_stats = stats.to_dict()
+    return {
+        "root": root,
+        "scene": scene_path,
+        "materials": len(results),
+        "imported": run_stats["counters"].get("materials imported", 0),
+        "connected": sum(status in ("Connected", "Reused") for status in report),
+        "missing": report.count("Missing"),
+        "assigned": sum(len(assignment["meshes"]) for assignment in assignments if assignment["status"] == "Assigned"),
+        "phases": run_stats["phases"],
+        "counters": run_stats["counters"],
+    }
+
+
+def run_worker(args):
+    result = {"target": args.target, "status": "ok", "error": None}
+    try:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        result.update(build_project(
+            args.target, args.naming, args.use_tx, not args.no_reuse, args.scene_name, args.save_stats, args.library,
+            args.library_path, not args.no_share_duplicates, args.assign
+        ))
+    except Exception as error:
+        traceback.print_exc()
+        result.update(status="failed", error=f"{type(error).__name__}: {error}")
+
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+    # Skipping maya.standalone.uninitialize() and the interpreter teardown saves seconds per project
+    os._exit(0 if result["status"] == "ok" else 1)
+
+
+def worker_command(
+    target, mayapy=MAYAPY, naming="prefix", use_tx=False, reuse_files=True, scene_name=SCENE_NAME, save_stats=False,
+    use_library=False, library_path=None, share_duplicates=True, assign=False
+):
+    command = split_command(mayapy) + [os.path.abspath(__file__), "--worker", target, "--naming", naming, "--scene-name", scene_name]
+    if use_tx:
+        command.append("--use-tx")
+    if not reuse_files:
+        command.append("--no-reuse")
+    if not share_duplicates:
+        command.append("--no-share-duplicates")
+    if assign:
+        command.append("--assign")
+    if save_stats:
+        command.append("--save-stats")
+    if use_library:
+        command.append("--library")
+    if library_path:
+        command.extend(["--library-path", os.path.abspath(library_path)])
+    return command
+
+
+def run_project(target, mayapy=MAYAPY, timeout=None, **options):
+    result = {"target": target, "status": "failed", "error": None}
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(
+            worker_command(target, mayapy, **options), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            universal_newlines=True, timeout=timeout
+        )
+    except OSError as error:
+        result["error"] = f"Could not start {mayapy}: {error}"
+    except subprocess.TimeoutExpired:
+        result["error"] = f"Timed out after {timeout} s"
+    else:
+        output = process.stdout.splitlines()
+        reported = [line for line in output if line.startswith(RESULT_MARKER)]
+        if reported:
+            result.update(json.loads(reported[-1][len(RESULT_MARKER):]))
+        else:
+            result["error"] = f"The worker exited with code {process.returncode} without a result."
+            if output:
+                result["error"] += "\n" + "\n".join(output[-OUTPUT_TAIL:])
+
+    result["target"] = target
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(targets, mayapy=MAYAPY, workers=None, timeout=None, progress=None, **options):
+    # Every project gets its own mayapy process, threads only wait on them
+    results = []
+    if not targets:
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(len(targets), workers or os.cpu_count() or 1)) as executor:
+        projects = [executor.submit(run_project, target, mayapy, timeout, **options) for target in targets]
+        for i, project in enumerate(as_completed(projects), start=1):
+            results.append(project.result())
+            if progress:
+                progress(results[-1], i, len(targets))
+
+    order = {target: i for i, target in enumerate(targets)}
+    results.sort(key=lambda result: order[result["target"]])
+    return results
+
+
+def format_report(results, seconds):
+    failed = [result for result in results if result["status"] != "ok"]
+    width = max([len("project")] + [len(result["target"]) for result in results])
+    lines = [f"{'project':<{width}}  {'status':<7}{'seconds':>9}{'materials':>11}{'imported':>10}{'missing':>9}"]
+    lines.append("-" * len(lines[0]))
+    for result in results:
+        lines.append(
+            f"{result['target']:<{width}}  {result['status']:<7}{result['seconds']:>9.1f}"
+            f"{result.get('materials', 0):>11}{result.get('imported', 0):>10}{result.get('missing', 0):>9}"
+        )
+
+    lines.append("")
+    materials = sum(result.get("materials", 0) for result in results)
+    busy = sum(result["seconds"] for result in results)
+    lines.append(
+        f"{len(results)} project(s), {materials} material(s) in {seconds:.1f} s "
+        f"({busy:.1f} s of worker time), {len(failed)} failed."
+    )
+    for result in failed:
+        lines.append(f"FAILED {result['target']}: {result['error']}")
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Scan and build shaders for several Maya projects at once, one mayapy process per project."
+    )
+    parser.add_argument("targets", nargs="*", help="Project folders or scene files (.ma/.mb)")
+    parser.add_argument("--list", help="Text file with one project folder or scene file per line")
+    parser.add_argument("--mayapy", default=MAYAPY, help="Interpreter command for the workers (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="Projects to run at once (default: one per core)")
+    parser.add_argument("--timeout", type=float, help="Seconds before a project is given up on")
+    parser.add_argument("--naming", default="prefix", choices=["prefix", "suffix"])
+    parser.add_argument("--use-tx", action="store_true", help="Convert and use .tx textures")
+    parser.add_argument("--no-reuse", action="store_true", help="Do not reuse file nodes reading the same texture")
+    parser.add_argument(
+        "--no-share-duplicates", action="store_true", help="Do not share file nodes between byte-identical textures"
+    )
+    parser.add_argument("--scene-name", default=SCENE_NAME, help="Scene saved under <project>/scenes for project folders")
+    parser.add_argument("--save-stats", action="store_true", help="Save each run's timings to texture_search_stats")
+    parser.add_argument("--library", action="store_true", help="Import unchanged networks from the material library")
+    parser.add_argument("--library-path", help="Shared library folder instead of one per project (implies --library)")
+    parser.add_argument("--assign", action="store_true", help="Assign the materials to meshes with matching names")
+    parser.add_argument("--json", help="Also write the per-project results to this file")
+    parser.add_argument("--worker", dest="target", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.target:
+        run_worker(args)
+
+    targets = list(args.targets)
+    if args.list:
+        with open(args.list) as list_file:
+            targets.extend(line.strip() for line in list_file if line.strip() and not line.startswith("#"))
+    if not targets:
+        print("Nothing to do, pass project folders or scene files.", file=sys.stderr)
+        return 2
+
+    def progress(result, done, total):
+        print(f"[{done}/{total}] {result['status']:<6} {result['target']} ({result['seconds']:.1f} s)", flush=True)
+
+    start = time.perf_counter()
+    results = run_batch(
+        targets, args.mayapy, args.workers, args.timeout, progress, naming=args.naming, use_tx=args.use_tx,
+        reuse_files=not args.no_reuse, scene_name=args.scene_name, save_stats=args.save_stats, use_library=args.library,
+        library_path=args.library_path, share_duplicates=not args.no_share_duplicates, assign=args.assign
+    )
+    seconds = time.perf_counter() - start
+    print("\n".join(format_report(results, seconds)))
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({"seconds": seconds, "projects": results}, json_file, indent=2)
+    return 1 if any(result["status"] != "ok" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2023 @@
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+
+import texture_search_images as images
+
+import time
+
+import os
+import re
+import csv
+import json
+import hashlib
+import pstats
+import cProfile
+import contextlib
+import subprocess
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+POSSIBLE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".tga", ".exr", ".tiff"]
+SCAN_CACHE_NAME = ".texture_scan_cache.json"
+# Per-run timing JSON and cProfile dumps are written here, inside the project root
+STATS_FOLDER = "texture_search_stats"
+# Exported shader networks and their manifest, inside the project root unless another library is given
+LIBRARY_FOLDER = "texture_search_library"
+LIBRARY_MANIFEST = "manifest.json"
+# Downsampled viewport copies mirror sourceimages in <project>/texture_search_proxies/<size>
+PROXY_FOLDER = "texture_search_proxies"
+PROXY_SIZES = [512, 1024, 2048]
+PROXY_SIZE = 1024
+# Listing a folder on a network share is mostly waiting, so the crawl overlaps several of them
+SCAN_WORKERS = 8
+TX_CONVERTER = "maketx -v -u --oiio {input} -o {output}"
+# Textures with a side at least this long are called out in the memory report
+LARGE_TEXTURE_SIZE = 16384
+# UDIM tiles start at 1001, so frame numbers like .0001 are not taken for tiles
+UDIM_PATTERN = r"100[1-9]|10[1-9]\d|1[1-9]\d\d|[2-9]\d{3}"
+
+RAW_COLORSPACE = "Raw"
+LINEAR_COLORSPACE = "scene-linear Rec 709/sRGB"
+
+DEFAULT_CONVENTIONS = {
+    "base_color": "BaseColor",
+    "roughness": "Roughness",
+    "metalness": "Metallic",
+    "transmission": "Transmission",
+    "normal": "Normal",
+    "displacement": "Height",
+    "ambient_occlusion": "AO",
+    "packed_orm": "ORM",
+    "packed_arm": "ARM"
+}
+
+# role: (attribute, is_raw, use_red_channel)
+TEXTURE_MAPS = {
+    "base_color": ("baseColor", False, False),
+    "roughness": ("specularRoughness", True, True),
+    "metalness": ("metalness", True, True),
+    "transmission": ("transmission", True, True),
+    "normal": ("normalCamera", False, False),
+    "displacement": ("displacementShader", True, True),
+    "ambient_occlusion": ("ambientOcclusion", True, True)
+}
+
+# role: roles driven by the R, G and B channels of one channel-packed texture
+PACKED_MAPS = {
+    "packed_orm": ("ambient_occlusion", "roughness", "metalness"),
+    "packed_arm": ("ambient_occlusion", "roughness", "metalness")
+}
+
+BUILD_COMMAND = "textureSearchBuild"
+REPORT_COLUMNS = ["material", "status", "map", "message"]
+REPORT_STATUSES = [
+    "Connected", "Reused", "Retargeted", "Unchanged", "Imported", "Missing", "Large", "Memory", "Assigned",
+    "Would Assign", "No Mesh", "No Shader"
+]
+
+# Tried in order, a mesh goes to the first rule that matches it and then to the longest name
+ASSIGN_RULES = ["exact", "prefix"]
+ASSIGN_RULE_CHOICES = ["exact", "prefix", "contains"]
+# Name tokens that say nothing about the asset, dropped from mesh and texture names before matching
+ASSIGN_IGNORED_TOKENS = ["geo", "geom", "mesh", "msh", "ply"]
+ASSIGN_UNDO_CHUNK = "textureSearchAssign"
+
+# Default lists Maya's shadingNode command registers new nodes in, so Hypershade can find them
+DEFAULT_NODE_LISTS = {
+    "shader": ("defaultShaderList1", "shaders"),
+    "texture": ("defaultTextureList1", "textures"),
+    "utility": ("defaultRenderUtilityList1", "utilities")
+}
+
+PLACE2D_CONNECTIONS = [("outUV", "uvCoord"), ("outUvFilterSize", "uvFilterSize")] + [
+    (attr, attr) for attr in [
+        "coverage", "translateFrame", "rotateFrame", "mirrorU", "mirrorV", "stagger",
+        "wrapU", "wrapV", "repeatUV", "offset", "rotateUV", "noiseUV"
+    ]
+]
+
+
+def scan_directory(root):
+    files = []
+    sub_dirs = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                # Linked folders are left out like os.walk does by default, a link back up the tree would never end
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(entry.name)
+                elif not entry.is_dir():
+                    files.append(entry.name)
+    except OSError:
+        return None
+    
+    return files, sub_dirs
+
+
+class RunStats(object):
+    
+    def __init__(self, json_path=None, profile_path=None):
+        self.json_path = json_path
+        self.profile_path = profile_path
+        
+        self.phases = {}
+        self.counters = Counter()
+        self.profiles = []
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        
+    @classmethod
+    def for_project(cls, project_path, write_json=False, profile=False):
+        base_path = os.path.join(project_path, STATS_FOLDER, time.strftime("%Y%m%d_%H%M%S"))
+        return cls(f"{base_path}.json" if write_json else None, f"{base_path}.prof" if profile else None)
+        
+    @contextlib.contextmanager
+    def phase(self, name):
+        # Only the outermost phase on a thread is profiled, nested profilers are not allowed
+        profiler = None
+        if self.profile_path and not getattr(self.local, "profiling", False):
+            profiler = cProfile.Profile()
+            self.local.profiling = True
+            profiler.enable()
+        
+        # Registered up front so the report lists phases in the order they started
+        with self.lock:
+            self.phases.setdefault(name, 0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+            if profiler:
+                profiler.disable()
+                self.local.profiling = False
+                with self.lock:
+                    self.profiles.append(profiler)
+                
+    def add_time(self, name, seconds):
+        with self.lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+            
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+            
+    def to_dict(self):
+        return {
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters)
+        }
+    
+    def save(self):
+        written = []
+        if self.json_path:
+            os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
+            with open(self.json_path, "w") as json_file:
+                json.dump(self.to_dict(), json_file, indent=2)
+            written.append(self.json_path)
+        
+        if self.profile_path and self.profiles:
+            os.makedirs(os.path.dirname(self.profile_path), exist_ok=True)
+            profile_stats = pstats.Stats(self.profiles[0])
+            for profiler in self.profiles[1:]:
+                profile_stats.add(profiler)
+            profile_stats.dump_stats(self.profile_path)
+            written.append(self.profile_path)
+        return written
+    
+    def report(self):
+        if self.phases:
+            timings = ", ".join(f"{name} {seconds:.3f} s" for name, seconds in self.phases.items())
+            om.MGlobal.displayInfo(f"Texture search timings: {timings}")
+        if self.counters:
+            counters = ", ".join(f"{name} {value}" for name, value in self.counters.items())
+            om.MGlobal.displayInfo(f"Texture search counters: {counters}")
+        
+        try:
+            written = self.save()
+        except OSError as error:
+            om.MGlobal.displayWarning(f"Could not write the run statistics: {error}")
+            return
+        for path in written:
+            om.MGlobal.displayInfo(f"Run statistics written to {path}")
+
+
+class ScanCache(object):
+    
+    VERSION = 3
+    # Folders touched this recently may still change within the same mtime tick
+    RACY_SECONDS = 2.0
+    
+    def __init__(self, cache_path, textures_path):
+        self.cache_path = cache_path
+        self.textures_path = textures_path
+        
+        self.directories = {}
+        self.scanned = {}
+        self.images = {}
+        self.hashes = {}
+        self.sizes = {}
+        self.rescanned = 0
+        self.lock = threading.Lock()
+        
+    @classmethod
+    def for_workspace(cls, project_path, textures_path):
+        return cls(os.path.join(project_path, SCAN_CACHE_NAME), textures_path).load()
+        
+    def load(self):
+        self.directories = {}
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return self
+        
+        if data.get("version") == self.VERSION and data.get("textures_path") == self.textures_path:
+            self.directories = data.get("directories", {})
+            self.images = {
+                os.path.join(self.textures_path, path): info for path, info in data.get("images", {}).items()
+            }
+            self.hashes = {
+                os.path.join(self.textures_path, path): digest for path, digest in data.get("hashes", {}).items()
+            }
+            self.sizes = {
+                os.path.join(self.textures_path, path): size for path, size in data.get("sizes", {}).items()
+            }
+        return self
+    
+    def list_dir(self, root):
+        try:
+            mtime = os.stat(root).st_mtime_ns
+        except OSError:
+            return None
+        
+        key = os.path.relpath(root, self.textures_path)
+        cached = self.directories.get(key)
+        if cached and cached[0] == mtime and time.time() - mtime / 1e9 > self.RACY_SECONDS:
+            self.scanned[key] = cached
+            return cached[1], cached[2]
+        
+        listing = scan_directory(root)
+        if listing is None:
+            return None
+        
+        with self.lock:
+            self.rescanned += 1
+        self.scanned[key] = [mtime, listing[0], listing[1]]
+        return listing
+    
+    def finish_scan(self):
+        # Only the folders seen in this scan are kept, so deleted folders drop out of the cache
+        self.directories = self.scanned
+        self.scanned = {}
+    
+    def relative_entries(self, entries):
+        relative_entries = {}
+        # Every path was joined onto textures_path, cutting the prefix off is much cheaper than os.path.relpath
+        prefix = os.path.join(self.textures_path, "")
+        for path, entry in entries.items():
+            relative_path = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, self.textures_path)
+            # Probes for files in folders that are gone from the scan are dropped with them
+            if (os.path.dirname(relative_path) or ".") in self.directories:
+                relative_entries[relative_path] = entry
+        return relative_entries
+    
+    def save(self):
+        data = {
+            "version": self.VERSION,
+            "textures_path": self.textures_path,
+            "directories": self.directories,
+            "images": self.relative_entries(self.images),
+            "hashes": self.relative_entries(self.hashes),
+            "sizes": self.relative_entries(self.sizes)
+        }
+        temp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(temp_path, "w") as cache_file:
+                # dumps goes through the C encoder, dump streams through the pure Python one
+                cache_file.write(json.dumps(data, separators=(",", ":")))
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            return False
+        
+        return True
+
+
+def compile_classifier(suffixes, extensions):
+    # One pattern splits a file name into name, map suffix, UDIM tile and extension.
+    # The name is greedy, so when several suffixes could match the split at the last '_' wins.
+    suffix_pattern = "|".join(re.escape(suffix) for suffix in suffixes)
+    extension_pattern = "|".join(re.escape(ext) for ext in extensions)
+    return re.compile(
+        rf"^(?P<name>.+)_(?P<suffix>{suffix_pattern})(?:\.(?P<tile>{UDIM_PATTERN}))?(?i:(?P<ext>{extension_pattern}))$"
+    )
+
+
+class TextureEntry(object):
+
+    def __init__(self, path, root, ext_rank, tile=None):
+        self.path = path
+        self.root = root
+        self.ext_rank = ext_rank
+        self.tiles = [tile] if tile else []
+
+    def add_tile(self, tile, path):
+        if tile in self.tiles:
+            return
+        if tile < self.tiles[0]:
+            self.path = path
+        self.tiles.append(tile)
+        self.tiles.sort()
+
+    @property
+    def has_udims(self):
+        return bool(self.tiles)
+
+    @property
+    def tile_count(self):
+        return len(self.tiles)
+
+    def tile_paths(self):
+        if not self.tiles:
+            return [self.path]
+        base_path, ext = os.path.splitext(self.path)
+        return [f"{base_path[:-4]}{tile}{ext}" for tile in self.tiles]
+
+
+class TextureIndex(object):
+    
+    def __init__(self, textures_path, suffixes, extensions=POSSIBLE_EXTENSIONS):
+        self.textures_path = textures_path
+        self.suffixes = [suffix for suffix in suffixes if suffix]
+        self.extensions = [ext.lower() for ext in extensions]
+        self.extension_ranks = {ext: rank for rank, ext in reversed(list(enumerate(self.extensions)))}
+        self.classifier = compile_classifier(self.suffixes, self.extensions)
+        
+        self.entries = {}
+        self.names = {}
+        self.cancelled = False
+        # Per folder bookkeeping, so a changed folder can be applied without walking the tree again
+        self.folder_order = {}
+        self.folder_dirs = {}
+        self.folder_listings = {}
+        self.folder_files = None
+        self.key_roots = None
+        
+    def build(self, scan_cache=None, on_names=None, is_cancelled=None, workers=SCAN_WORKERS, stats=None):
+        self.entries = {}
+        self.names = {}
+        self.cancelled = False
+        self.folder_order = {}
+        self.folder_dirs = {}
+        self.folder_listings = {}
+        self.folder_files = None
+        self.key_roots = None
+        stats = stats if stats is not None else RunStats()
+        folder_count = 0
+        file_count = 0
+        list_time = 0.0
+        match_time = 0.0
+        
+        list_dir = scan_cache.list_dir if scan_cache else scan_directory
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            listings = {self.textures_path: executor.submit(list_dir, self.textures_path)}
+            
+            stack = [self.textures_path]
+            while stack:
+                if is_cancelled and is_cancelled():
+                    for listing in listings.values():
+                        listing.cancel()
+                    # A partial listing would make the cache forget the folders that were never reached
+                    self.cancelled = True
+                    return self
+                
+                root = stack.pop()
+                start = time.perf_counter()
+                listing = listings.pop(root).result()
+                list_time += time.perf_counter() - start
+                if listing is None:
+                    continue
+                
+                files, sub_dirs = listing
+                folder_count += 1
+                file_count += len(files)
+                sub_paths = [os.path.join(root, sub_dir) for sub_dir in sub_dirs]
+                self.folder_order[root] = len(self.folder_order)
+                self.folder_dirs[root] = sub_paths
+                self.folder_listings[root] = files
+                for sub_path in sub_paths:
+                    listings[sub_path] = executor.submit(list_dir, sub_path)
+                
+                name_count = len(self.names)
+                start = time.perf_counter()
+                for file in files:
+                    self.add_file(root, file)
+                match_time += time.perf_counter() - start
+                
+                if on_names and len(self.names) > name_count:
+                    on_names(list(self.names)[name_count:])
+                
+                # Folders are listed concurrently but merged in os.walk's top-down order,
+                # so the first folder holding a texture wins exactly like a serial scan
+                stack.extend(reversed(sub_paths))
+        
+        # Waiting on the listing threads is the part of the crawl the merge actually feels
+        stats.add_time("list folders", list_time)
+        stats.add_time("match names", match_time)
+        stats.count("folders listed", scan_cache.rescanned if scan_cache else folder_count)
+        stats.count("folders from cache", folder_count - scan_cache.rescanned if scan_cache else 0)
+        stats.count("files scanned", file_count)
+        stats.count("names found", len(self.names))
+        
+        if scan_cache:
+            scan_cache.finish_scan()
+            with stats.phase("save scan cache"):
+                scan_cache.save()
+            
+        return self
+        
+    def match_file(self, file):
+        match = self.classifier.match(file) if self.suffixes else None
+        if match is None:
+            return None
+        
+        name, suffix, tile, ext = match.group("name", "suffix", "tile", "ext")
+        return (name, suffix), int(tile) if tile else None, self.extension_ranks[ext.lower()]
+        
+    def add_file(self, root, file):
+        matched = self.match_file(file)
+        if matched is None:
+            return
+        
+        key, tile, ext_rank = matched
+        self.names.setdefault(key[0], None)
+        self.merge_file(root, file, key, tile, ext_rank)
+        
+    def merge_file(self, root, file, key, tile, ext_rank):
+        path = os.path.join(root, file)
+        texture = self.entries.get(key)
+        
+        if texture is None or (texture.root == root and ext_rank < texture.ext_rank):
+            self.entries[key] = TextureEntry(path, root, ext_rank, tile)
+        elif texture.root == root and ext_rank == texture.ext_rank and texture.tiles:
+            if tile is None:
+                self.entries[key] = TextureEntry(path, root, ext_rank)
+            else:
+                texture.add_tile(tile, path)
+                
+    def index_folders(self):
+        # Only watching needs to know which maps each folder holds, so a scan keeps the listings and leaves this to it
+        if self.folder_files is not None:
+            return
+        self.folder_files = {}
+        self.key_roots = {}
+        for root in self.folder_order:
+            for file in self.folder_listings.pop(root, ()):
+                self.index_folder_file(root, file)
+    
+    def index_folder_file(self, root, file):
+        matched = self.match_file(file)
+        if matched:
+            key, tile, ext_rank = matched
+            self.folder_files.setdefault(root, {}).setdefault(key, []).append((file, tile, ext_rank))
+            self.key_roots.setdefault(key, set()).add(root)
+    
+    def update_folder(self, root, files):
+        # Only the maps this folder held before or holds now are resolved again, in the order of the first walk
+        self.index_folders()
+        self.folder_order.setdefault(root, len(self.folder_order))
+        old_keys = set(self.folder_files.pop(root, {}))
+        for key in old_keys:
+            self.key_roots[key].discard(root)
+        
+        for file in files:
+            self.index_folder_file(root, file)
+        
+        changed = []
+        for key in old_keys | set(self.folder_files.get(root, {})):
+            before = self.entries.pop(key, None)
+            roots = self.key_roots.get(key)
+            if roots:
+                winner = min(roots, key=self.folder_order.get)
+                for file, tile, ext_rank in self.folder_files[winner][key]:
+                    self.merge_file(winner, file, key, tile, ext_rank)
+            else:
+                self.key_roots.pop(key, None)
+            
+            after = self.entries.get(key)
+            if (before and (before.path, before.tiles)) != (after and (after.path, after.tiles)):
+                changed.append(key)
+        
+        for name in {key[0] for key in changed}:
+            if any((name, suffix) in self.entries for suffix in self.suffixes):
+                self.names.setdefault(name, None)
+            else:
+                self.names.pop(name, None)
+        return changed
+    
+    def remove_folder(self, root):
+        removed = [
+            folder for folder in self.folder_order if folder == root or folder.startswith(root + os.sep)
+        ]
+        changed = []
+        for folder in removed:
+            changed.extend(self.update_folder(folder, []))
+            self.folder_order.pop(folder, None)
+            self.folder_dirs.pop(folder, None)
+        return changed, removed
+        
+    def folders(self):
+        return list(self.folder_order)
+        
+    def possible_names(self):
+        return list(self.names)
+    
+    def find(self, name, suffix):
+        return self.entries.get((name, suffix))
+
+
+class TexturePlan(object):
+    
+    def __init__(self, project_path, conventions, texture_index, scan_cache=None):
+        self.project_path = project_path
+        self.textures_path = texture_index.textures_path
+        self.conventions = conventions
+        self.texture_index = texture_index
+        self.scan_cache = scan_cache
+        self.names = texture_index.possible_names()
+        self.image_info = {}
+        self.duplicates = {}
+        self.file_sizes = {}
+        self.file_hashes = {}
+        
+    def texture_maps(self):
+        texture_maps = {}
+        for role, (attr, is_raw, use_red_channel) in TEXTURE_MAPS.items():
+            suffix = self.conventions.get(role)
+            if suffix and suffix not in texture_maps:
+                texture_maps[suffix] = (role, attr, is_raw, use_red_channel)
+        return texture_maps
+    
+    def packed_maps(self):
+        packed_maps = {}
+        for role, channel_roles in PACKED_MAPS.items():
+            suffix = self.conventions.get(role)
+            if suffix and suffix not in packed_maps:
+                packed_maps[suffix] = (role, channel_roles)
+        return packed_maps
+    
+    def find(self, name, suffix):
+        return self.texture_index.find(name, suffix)
+    
+    def find_packed(self, name):
+        # The first packed convention with a texture wins and replaces the separate maps of its channels
+        for suffix, (role, channel_roles) in self.packed_maps().items():
+            texture = self.find(name, suffix)
+            if texture:
+                return suffix, channel_roles, texture
+        return None
+    
+    def map_layout(self, name):
+        # (suffix, role, texture) for every map a network for this name reads, texture is None when it is missing
+        layout = []
+        covered_roles = set()
+        packed = self.find_packed(name)
+        if packed:
+            suffix, channel_roles, texture = packed
+            layout.append((suffix, self.packed_maps()[suffix][0], texture))
+            covered_roles.update(channel_roles)
+        
+        for suffix, (role, attr, is_raw, use_red_channel) in self.texture_maps().items():
+            if role not in covered_roles:
+                layout.append((suffix, role, self.find(name, suffix)))
+        return layout
+    
+    def probe(self, names=None, workers=images.PROBE_WORKERS, stats=None):
+        stats = stats if stats is not None else RunStats()
+        paths = []
+        for name in self.names if names is None else names:
+            for suffix, role, texture in self.map_layout(name):
+                if texture:
+                    paths.extend(path for path in texture.tile_paths() if path not in self.image_info)
+        
+        if not paths:
+            return self.image_info
+        
+        cache = self.scan_cache.images if self.scan_cache else None
+        with stats.phase("probe images"):
+            self.image_info.update(images.probe_images(paths, cache, workers))
+        stats.count("images probed", len(paths))
+        if self.scan_cache:
+            with stats.phase("save scan cache"):
+                self.scan_cache.save()
+        return self.image_info
+    
+    def find_duplicates(self, names=None, workers=images.HASH_WORKERS, stats=None):
+        # Only the batch's textures are checked on disk, the rest of the plan is compared through the file sizes the cache
+        # remembers, so a watch update or a single material costs as much as its own maps
+        stats = stats if stats is not None else RunStats()
+        names = set(self.names if names is None else names)
+        
+        with stats.phase("find duplicates"):
+            batch = set()
+            for name in names:
+                for suffix, role, texture in self.map_layout(name):
+                    if texture:
+                        batch.add(texture.path)
+            
+            file_sizes = self.scan_cache.sizes if self.scan_cache else self.file_sizes
+            textures = list(self.texture_index.entries.items())
+            stat_paths = [
+                path for (name, suffix), texture in textures for path in texture.tile_paths()
+                if texture.path in batch or path not in file_sizes
+            ]
+            sizes_changed = False
+            for path in stat_paths:
+                try:
+                    size = os.stat(path).st_size
+                except OSError:
+                    sizes_changed |= file_sizes.pop(path, None) is not None
+                    continue
+                if file_sizes.get(path) != size:
+                    file_sizes[path] = size
+                    sizes_changed = True
+            
+            # Files can only be identical when their sizes are, so only textures sharing their tile sizes are hashed
+            by_size = {}
+            for (name, suffix), texture in textures:
+                sizes = tuple(file_sizes.get(path) for path in texture.tile_paths())
+                if None not in sizes:
+                    by_size.setdefault((tuple(texture.tiles), sizes), []).append((suffix, texture))
+            candidates = [
+                entry for group in by_size.values()
+                if len(group) > 1 and any(texture.path in batch for suffix, texture in group) for entry in group
+            ]
+            
+            # A cached size can be stale for a file overwritten in place, so every candidate is checked on disk again before
+            # it is shared: fingerprint_files only reuses a digest whose mtime and size still match
+            cache = self.scan_cache.hashes if self.scan_cache else self.file_hashes
+            paths = [path for suffix, texture in candidates for path in texture.tile_paths()]
+            cached = [cache.get(path) for path in paths]
+            digests = images.fingerprint_files(paths, cache, workers) if paths else {}
+            cache_changed = sizes_changed or any(cache.get(path) is not entry for path, entry in zip(paths, cached))
+            for path in paths:
+                if path in cache and file_sizes.get(path) != cache[path][1]:
+                    file_sizes[path] = cache[path][1]
+                    cache_changed = True
+            
+            identical = {}
+            for suffix, texture in candidates:
+                tile_digests = tuple(digests.get(path) for path in texture.tile_paths())
+                if all(tile_digests):
+                    identical.setdefault((tuple(texture.tiles), tile_digests), []).append((suffix, texture))
+        stats.count("file sizes checked", len(stat_paths))
+        stats.count("files fingerprinted", len(paths))
+        
+        groups = sorted(
+            (
+                sorted(group, key=lambda entry: entry[1].path) for group in identical.values()
+                if len(group) > 1 and any(texture.path in batch for suffix, texture in group)
+            ),
+            key=lambda group: group[0][1].path
+        )
+        # Only copies used for the same map share a node, the same pixels read as colour and as data need two.
+        # Lookups only ever ask for the textures of the batch, so the groups of this batch replace the previous ones
+        self.duplicates = {}
+        for group in groups:
+            same_map = {}
+            for suffix, texture in group:
+                same_map.setdefault(suffix, []).append(texture)
+            for textures in same_map.values():
+                if len(textures) > 1:
+                    self.duplicates.update((path_key(texture.path), textures) for texture in textures)
+        
+        if self.scan_cache and cache_changed:
+            with stats.phase("save scan cache"):
+                self.scan_cache.save()
+        stats.count("duplicate textures", sum(len(group) - 1 for group in groups))
+        return groups
+    
+    def identical_textures(self, texture):
+        return self.duplicates.get(path_key(texture.path), [texture])
+    
+    def refresh(self, folders, stats=None):
+        # Applies folders a watcher reported as changed: they are re-listed on their own, new sub-folders walked
+        stats = stats if stats is not None else RunStats()
+        index = self.texture_index
+        changed = []
+        added_folders = []
+        removed_folders = []
+        
+        with stats.phase("refresh folders"):
+            # Paths are kept exactly as the index spelled them, so they are looked up as given
+            stack = list(folders)
+            while stack:
+                root = stack.pop()
+                listing = scan_directory(root) if os.path.isdir(root) else None
+                if listing is None:
+                    folder_changes, removed = index.remove_folder(root)
+                    changed.extend(folder_changes)
+                    removed_folders.extend(removed)
+                    continue
+                
+                files, sub_dirs = listing
+                stats.count("folders relisted")
+                sub_paths = [os.path.join(root, sub_dir) for sub_dir in sub_dirs]
+                for gone in set(index.folder_dirs.get(root, [])) - set(sub_paths):
+                    folder_changes, removed = index.remove_folder(gone)
+                    changed.extend(folder_changes)
+                    removed_folders.extend(removed)
+                for sub_path in sub_paths:
+                    if sub_path not in index.folder_order:
+                        added_folders.append(sub_path)
+                        stack.append(sub_path)
+                
+                if root not in index.folder_order:
+                    added_folders.append(root)
+                index.folder_dirs[root] = sub_paths
+                changed.extend(index.update_folder(root, files))
+                
+                if self.scan_cache:
+                    try:
+                        mtime = os.stat(root).st_mtime_ns
+                    except OSError:
+                        continue
+                    self.scan_cache.directories[os.path.relpath(root, self.textures_path)] = [mtime, files, sub_dirs]
+        
+        for removed in removed_folders:
+            if self.scan_cache:
+                self.scan_cache.directories.pop(os.path.relpath(removed, self.textures_path), None)
+        if self.scan_cache and (changed or added_folders or removed_folders):
+            self.scan_cache.save()
+        
+        self.names = index.possible_names()
+        stats.count("maps changed", len(changed))
+        return {
+            "changed": sorted(set(changed)),
+            "added_folders": [folder for folder in added_folders if folder in index.folder_order],
+            "removed_folders": removed_folders
+        }
+    
+    def texture_info(self, texture):
+        return self.image_info.get(texture.path)
+    
+    def texture_memory(self, texture):
+        return sum(info.memory for info in map(self.image_info.get, texture.tile_paths()) if info)
+
+
+def choose_colorspace(role, is_raw, info):
+    # Data maps are always Raw; colour maps stored as floating point are already linear
+    if is_raw or role == "normal":
+        return RAW_COLORSPACE
+    if info and info.is_float:
+        return LINEAR_COLORSPACE
+    return None
+
+
+def scan(root=None, conventions=None, use_cache=True, workers=SCAN_WORKERS, stats=None):
+    if root is None:
+        root = cmds.workspace(q=True, rootDirectory=True)
+    
+    plan = scan_textures(root, conventions, use_cache, workers=workers, stats=stats)
+    report_scan(plan)
+    return plan
+
+
+def scan_textures(
+    root, conventions=None, use_cache=True, on_names=None, is_cancelled=None, workers=SCAN_WORKERS, stats=None
+):
+    # No Maya calls in here, so it is safe to run from a worker thread
+    stats = stats if stats is not None else RunStats()
+    conventions = dict(DEFAULT_CONVENTIONS, **(conventions or {}))
+    
+    textures_path = os.path.join(root, "sourceimages")
+    texture_index = TextureIndex(textures_path, conventions.values())
+    
+    if not os.path.isdir(textures_path):
+        return TexturePlan(root, conventions, texture_index)
+    
+    with stats.phase("scan"):
+        scan_cache = ScanCache.for_workspace(root, textures_path) if use_cache else None
+        texture_index.build(scan_cache, on_names, is_cancelled, workers, stats)
+    
+    return TexturePlan(root, conventions, texture_index, scan_cache)
+
+
+def report_scan(plan):
+    if not os.path.isdir(plan.textures_path):
+        om.MGlobal.displayWarning("The sourceimages folder does not exist in the current project.")
+    elif plan.scan_cache:
+        om.MGlobal.displayInfo(f"Scanned {plan.textures_path}, {plan.scan_cache.rescanned} folder(s) changed since the last search.")
+
+
+def tx_path(path):
+    return os.path.splitext(path)[0] + ".tx"
+
+
+def tx_is_current(path):
+    try:
+        return os.stat(tx_path(path)).st_mtime >= os.stat(path).st_mtime
+    except OSError:
+        return False
+
+
+def resolve_texture_path(texture, use_tx=False):
+    # Only switch to .tx when every tile has an up to date one, a mixed UDIM set would not load
+    if use_tx and all(tx_is_current(path) for path in texture.tile_paths()):
+        return tx_path(texture.path)
+    return texture.path
+
+
+def stale_tx_sources(plan, names=None):
+    sources = []
+    for name in plan.names if names is None else names:
+        for suffix, role, texture in plan.map_layout(name):
+            if texture:
+                sources.extend(path for path in texture.tile_paths() if not tx_is_current(path))
+    return sources
+
+
+def convert_to_tx(source, converter=TX_CONVERTER):
+    command = [arg.format(input=source, output=tx_path(source)) for arg in images.split_command(converter)]
+    try:
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    except OSError as e:
+        return source, str(e)
+    
+    if process.returncode != 0:
+        output = process.stdout.strip().splitlines()
+        return source, output[-1] if output else f"exit code {process.returncode}"
+    return source, None
+
+
+def convert_tx(sources, converter=TX_CONVERTER, workers=None, progress=None):
+    # The converter does the heavy lifting in its own process, so threads are enough to keep every core busy
+    result = {"converted": [], "failed": [], "cancelled": False}
+    if not sources:
+        return result
+    
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        conversions = [executor.submit(convert_to_tx, source, converter) for source in sources]
+        
+        for i, conversion in enumerate(as_completed(conversions), start=1):
+            source, error = conversion.result()
+            if error:
+                result["failed"].append((source, error))
+            else:
+                result["converted"].append(source)
+            
+            if progress and not progress(f"Converting: {os.path.basename(source)} ({i}/{len(sources)})", i, len(sources)):
+                for pending in conversions:
+                    pending.cancel()
+                result["cancelled"] = True
+                break
+    
+    return result
+
+
+def report_tx_conversion(result):
+    for source, error in result["failed"]:
+        om.MGlobal.displayWarning(f"Could not convert {source} to .tx: {error}")
+    om.MGlobal.displayInfo(f"Converted {len(result['converted'])} texture(s) to .tx, {len(result['failed'])} failed.")
+
+
+def proxy_path(plan, path, size=PROXY_SIZE):
+    # Kept out of sourceimages so the scan never finds them, and under the same file name so UDIM tokens still resolve
+    return os.path.join(plan.project_path, PROXY_FOLDER, str(size), os.path.relpath(path, plan.textures_path))
+
+
+def full_resolution_path(plan, path):
+    # A proxy sits at the same relative path under texture_search_proxies/<size> as its source in sourceimages
+    proxy_root = path_key(os.path.join(plan.project_path, PROXY_FOLDER)) + os.sep
+    key = path_key(path)
+    if not key.startswith(proxy_root):
+        return path
+    return os.path.join(plan.textures_path, key[len(proxy_root):].partition(os.sep)[2])
+
+
+def has_proxies(plan, texture, size=PROXY_SIZE):
+    return all(images.proxy_is_current(path, proxy_path(plan, path, size)) for path in texture.tile_paths())
+
+
+def stale_proxy_jobs(plan, names=None, size=PROXY_SIZE):
+    jobs = []
+    for name in plan.names if names is None else names:
+        for suffix, role, texture in plan.map_layout(name):
+            if not texture or os.path.splitext(texture.path)[1].lower() not in images.PROXY_EXTENSIONS:
+                continue
+            for path in texture.tile_paths():
+                proxy = proxy_path(plan, path, size)
+                if not images.proxy_is_current(path, proxy):
+                    jobs.append((path, proxy))
+    return jobs
+
+
+def generate_proxies(plan, names=None, size=PROXY_SIZE, workers=None, progress=None):
+    return images.make_proxies(stale_proxy_jobs(plan, names, size), size, workers, progress)
+
+
+def report_proxies(result):
+    for source, error in result["failed"]:
+        om.MGlobal.displayWarning(f"Could not make a proxy of {source}: {error}")
+    om.MGlobal.displayInfo(f"Generated {len(result['generated'])} proxy texture(s), {len(result['failed'])} failed.")
+
+
+def set_proxy_paths(plan, use_proxy, size=PROXY_SIZE, use_tx=False, stats=None):
+    # Repoints every file node reading one of the plan's textures in one undo step, proxies only when all tiles have one
+    stats = stats if stats is not None else RunStats()
+    textures = {}
+    for texture in plan.texture_index.entries.values():
+        for path in (texture.path, tx_path(texture.path)) + tuple(
+            proxy_path(plan, texture.path, proxy_size) for proxy_size in PROXY_SIZES
+        ):
+            textures.setdefault(path_key(path), texture)
+    
+    builder = ShaderNetworkBuilder(stats=stats)
+    switched = 0
+    skipped = []
+    with stats.phase("switch proxies"):
+        for file_node, path in builder.scene_index.file_paths.items():
+            texture = textures.get(path_key(path))
+            if texture is None:
+                continue
+            
+            if use_proxy and not has_proxies(plan, texture, size):
+                skipped.append(file_node)
+                continue
+            target = proxy_path(plan, texture.path, size) if use_proxy else resolve_texture_path(texture, use_tx)
+            if path_key(target) != path_key(path):
+                builder.set_attr(builder.node(file_node), "fileTextureName", target)
+                switched += 1
+        
+        if switched:
+            builder.commit()
+    
+    stats.count("file nodes switched", switched)
+    resolution = f"{size}px proxies" if use_proxy else "full resolution"
+    om.MGlobal.displayInfo(f"Switched {switched} file node(s) to {resolution}.")
+    if skipped:
+        om.MGlobal.displayWarning(f"{len(skipped)} file node(s) have no up to date proxy and stay at full resolution: {', '.join(skipped)}")
+    return {"switched": switched, "skipped": skipped}
+
+
+def maya_useNewAPI():
+    pass
+
+
+class TextureSearchBuildCommand(om.MPxCommand):
+    
+    def __init__(self):
+        super(TextureSearchBuildCommand, self).__init__()
+        self.modifier = None
+        
+    def doIt(self, args):
+        import texture_search_engine
+        self.modifier = texture_search_engine.pending_modifiers.pop()
+        try:
+            self.modifier.doIt()
+        except RuntimeError:
+            self.modifier.undoIt()
+            raise
+        
+    def redoIt(self):
+        self.modifier.doIt()
+        
+    def undoIt(self):
+        self.modifier.undoIt()
+        
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin).registerCommand(BUILD_COMMAND, TextureSearchBuildCommand)
+
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(BUILD_COMMAND)
+
+
+pending_modifiers = []
+
+
+def path_key(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+class SceneIndex(object):
+    
+    NODE_TYPES = ["aiStandardSurface", "shadingEngine", "file"]
+    
+    def __init__(self):
+        self.node_types = {}
+        self.file_paths = {}
+        self.files_by_path = {}
+        
+    def build(self):
+        # One ls for every node the batch cares about, instead of an objExists per material and shading group
+        known_types = set(cmds.ls(nodeTypes=True) or [])
+        node_types = [node_type for node_type in self.NODE_TYPES if node_type in known_types]
+        listing = (cmds.ls(type=node_types, showType=True) or []) if node_types else []
+        self.node_types = dict(zip(listing[0::2], listing[1::2]))
+        
+        file_nodes = [name for name, node_type in self.node_types.items() if node_type == "file"]
+        selection = om.MSelectionList()
+        for file_node in file_nodes:
+            selection.add(file_node)
+        for i, file_node in enumerate(file_nodes):
+            plug = om.MFnDependencyNode(selection.getDependNode(i)).findPlug("fileTextureName", False)
+            self.add_file(file_node, plug.asString())
+        return self
+    
+    def exists(self, name):
+        return name in self.node_types
+    
+    def unique_name(self, name):
+        # The name Maya gives a new node when one with the requested name is already there
+        if name not in self.node_types:
+            return name
+        base = name.rstrip("0123456789")
+        index = 1
+        while f"{base}{index}" in self.node_types:
+            index += 1
+        return f"{base}{index}"
+    
+    def node_type(self, name):
+        return self.node_types.get(name)
+    
+    def add(self, name, node_type):
+        self.node_types.setdefault(name, node_type)
+    
+    def add_file(self, file_node, path):
+        self.file_paths[file_node] = path
+        if path:
+            self.files_by_path.setdefault(path_key(path), file_node)
+            
+    def file_path(self, file_node):
+        return self.file_paths.get(file_node, "")
+            
+    def file_for_path(self, path):
+        return self.files_by_path.get(path_key(path))
+
+
+class ShaderNetworkBuilder(object):
+    
+    def __init__(self, scene_index=None, stats=None):
+        self.modifier = om.MDGModifier()
+        self.stats = stats if stats is not None else RunStats()
+        with self.stats.phase("index scene"):
+            self.scene_index = scene_index or SceneIndex().build()
+        
+        self.node_count = 0
+        self.connection_count = 0
+        self.list_indices = {}
+        self.created = {}
+        # Existing file nodes this batch already retargeted or shared, so no other material repoints them
+        self.claimed_files = set()
+        
+    def node(self, name):
+        if not isinstance(name, str):
+            return name
+        if name in self.created:
+            return self.created[name]
+        return om.MSelectionList().add(name).getDependNode(0)
+        
+    def plug(self, node, attr):
+        return om.MFnDependencyNode(node).findPlug(attr, False)
+        
+    def create_node(self, node_type, name, category):
+        node = self.modifier.createNode(node_type)
+        self.modifier.renameNode(node, name)
+        self.scene_index.add(name, node_type)
+        self.created.setdefault(name, node)
+        self.node_count += 1
+        
+        list_name, list_attr = DEFAULT_NODE_LISTS[category]
+        self.connect_next_available(node, "message", list_name, list_attr)
+        return node
+    
+    def create_shading_group(self, name):
+        shading_group = self.modifier.createNode("shadingEngine")
+        self.modifier.renameNode(shading_group, name)
+        self.scene_index.add(name, "shadingEngine")
+        self.created.setdefault(name, shading_group)
+        self.node_count += 1
+        
+        self.connect_next_available(shading_group, "partition", "renderPartition", "sets")
+        return shading_group
+    
+    def connect_next_available(self, node, attr, array_node, array_attr):
+        key = (array_node, array_attr)
+        if key not in self.list_indices:
+            array_plug = self.plug(self.node(array_node), array_attr)
+            indices = array_plug.getExistingArrayAttributeIndices()
+            self.list_indices[key] = [array_plug, max(indices) + 1 if indices else 0]
+        
+        array_plug, index = self.list_indices[key]
+        self.list_indices[key][1] += 1
+        self.modifier.connect(self.plug(node, attr), array_plug.elementByLogicalIndex(index))
+        self.connection_count += 1
+        
+    def set_attr(self, node, attr, value):
+        plug = self.plug(node, attr)
+        if isinstance(value, str):
+            self.modifier.newPlugValueString(plug, value)
+        elif isinstance(value, bool):
+            self.modifier.newPlugValueBool(plug, value)
+        elif isinstance(value, int):
+            self.modifier.newPlugValueInt(plug, value)
+        else:
+            self.modifier.newPlugValueFloat(plug, value)
+    
+    def connect(self, source, source_attr, destination, destination_attr, force=False):
+        source_plug = self.plug(source, source_attr)
+        destination_plug = self.plug(destination, destination_attr)
+        if destination_plug.isDestination:
+            if destination_plug.source() == source_plug:
+                return
+            if force:
+                self.modifier.disconnect(destination_plug.source(), destination_plug)
+        self.modifier.connect(source_plug, destination_plug)
+        self.connection_count += 1
+        
+    def commit(self):
+        if not hasattr(cmds, BUILD_COMMAND):
+            cmds.loadPlugin(os.path.splitext(__file__)[0] + ".py", quiet=True)
+        
+        # The command takes ownership of the modifier, so the whole batch is one undo step
+        pending_modifiers.append(self.modifier)
+        getattr(cmds, BUILD_COMMAND)()
+        
+    @staticmethod
+    def name(node):
+        if isinstance(node, str):
+            return node
+        return om.MFnDependencyNode(node).name()
+
+
+class MaterialLibrary(object):
+    
+    # Bump whenever the builder makes different networks, so older exports are rebuilt instead of imported
+    VERSION = 2
+    
+    def __init__(self, library_path):
+        self.library_path = library_path
+        self.manifest_path = os.path.join(library_path, LIBRARY_MANIFEST)
+        self.entries = {}
+        
+    @classmethod
+    def for_workspace(cls, project_path):
+        return cls(os.path.join(project_path, LIBRARY_FOLDER)).load()
+    
+    def load(self):
+        self.entries = {}
+        try:
+            with open(self.manifest_path, "r") as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return self
+        
+        if data.get("version") == self.VERSION:
+            self.entries = data.get("assets", {})
+        return self
+    
+    def save(self):
+        temp_path = f"{self.manifest_path}.tmp"
+        try:
+            os.makedirs(self.library_path, exist_ok=True)
+            with open(temp_path, "w") as manifest_file:
+                json.dump({"version": self.VERSION, "assets": self.entries}, manifest_file, indent=2)
+            os.replace(temp_path, self.manifest_path)
+        except OSError:
+            return False
+        return True
+    
+    def asset_path(self, name):
+        return os.path.join(self.library_path, f"{name}.ma")
+    
+    def network_hash(self, plan, name, naming="prefix", shared_place2d=True, use_tx=False):
+        # Everything the built network depends on: the options, which maps exist and every tile's path, mtime and size
+        inputs = [self.VERSION, naming.lower(), shared_place2d]
+        for suffix, role, texture in plan.map_layout(name):
+            if texture is None:
+                inputs.append([suffix, role, None])
+                continue
+            
+            tiles = []
+            for path in texture.tile_paths():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    return None
+                tiles.append([path, stat.st_mtime_ns, stat.st_size])
+            inputs.append([suffix, role, resolve_texture_path(texture, use_tx), tiles])
+        return hashlib.sha1(json.dumps(inputs).encode("utf-8")).hexdigest()
+    
+    def lookup(self, name, network_hash):
+        entry = self.entries.get(name)
+        if network_hash and entry and entry["hash"] == network_hash and os.path.isfile(self.asset_path(name)):
+            return entry
+        return None
+    
+    def record(self, name, network_hash, material, shading_group):
+        self.entries[name] = {
+            "hash": network_hash,
+            "file": os.path.basename(self.asset_path(name)),
+            "material": material,
+            "shading_group": shading_group,
+            "exported": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+
+def import_library_network(plan, name, material_name, shading_group_name, library, scene_index, stats):
+    asset_path = library.asset_path(name)
+    new_nodes = cmds.file(
+        asset_path, i=True, type="mayaAscii", ignoreVersion=True, namespace=":", preserveReferences=True,
+        returnNewNodes=True
+    ) or []
+    
+    # The imported nodes join the scene index, so later materials in the batch can reuse their file nodes
+    listing = cmds.ls(new_nodes, showType=True) or []
+    for node, node_type in zip(listing[0::2], listing[1::2]):
+        scene_index.add(node, node_type)
+        if node_type == "file":
+            scene_index.add_file(node, cmds.getAttr(f"{node}.fileTextureName") or "")
+    
+    result = {
+        "name": name, "material": material_name, "shading_group": shading_group_name, "connections": [],
+        "missing": [], "report": [], "pending_info": [], "memory": 0, "large_textures": [], "imported_nodes": new_nodes
+    }
+    for suffix, role, texture in plan.map_layout(name):
+        if not texture:
+            message = f"No texture found for {suffix} or it isn't named as: {name}_{suffix}' in sourceimages."
+            result["missing"].append(message)
+            result["report"].append(("Missing", suffix, message))
+            continue
+        
+        info = plan.texture_info(texture)
+        result["memory"] += plan.texture_memory(texture)
+        if info and max(info.width, info.height) >= LARGE_TEXTURE_SIZE:
+            result["large_textures"].append(f"{os.path.basename(texture.path)} is {info.describe()}")
+        
+        message = f"Imported {os.path.basename(texture.path)} on {material_name} from {os.path.basename(asset_path)}"
+        result["connections"].append(message)
+        result["report"].append(("Imported", suffix, message))
+    
+    stats.count("materials imported")
+    stats.count("nodes imported", len(new_nodes))
+    return result
+
+
+def export_library_network(library, name, network_hash, material, shading_group):
+    # The shading group is selected as a node, not for its members, and the material network comes along as its history
+    cmds.select([material, shading_group], replace=True, noExpand=True)
+    cmds.file(
+        library.asset_path(name), exportSelected=True, type="mayaAscii", force=True, preserveReferences=False,
+        constructionHistory=True, shader=True, channels=False, constraints=False, expressions=False
+    )
+    library.record(name, network_hash, material, shading_group)
+
+
+def import_from_library(
+    plan, names, naming, library, scene_index, shared_place2d=True, use_tx=False, stats=None, reuse_files=True,
+    share_duplicates=False
+):
+    stats = stats if stats is not None else RunStats()
+    imported = []
+    hashes = {}
+    for name in names:
+        material_name, shading_group_name = shader_names(name, naming)
+        # Networks already in the scene go through the normal incremental update instead
+        if scene_index.exists(material_name) or scene_index.exists(shading_group_name):
+            continue
+        
+        hashes[name] = library.network_hash(plan, name, naming, shared_place2d, use_tx)
+        if not library.lookup(name, hashes[name]):
+            continue
+        # An import brings its own file nodes, so a texture a node in the scene already reads is built and reused instead
+        if reuse_files and any(
+            find_reusable_file(scene_index, shared_texture_files(
+                plan, texture, resolve_texture_path(texture, use_tx), use_tx, share_duplicates
+            ))
+            for suffix, role, texture in plan.map_layout(name) if texture
+        ):
+            continue
+        
+        try:
+            imported.append(import_library_network(
+                plan, name, material_name, shading_group_name, library, scene_index, stats
+            ))
+        except RuntimeError as error:
+            om.MGlobal.displayWarning(f"Could not import {name} from the material library, rebuilding it: {error}")
+    return imported, hashes
+
+
+def export_to_library(results, library, hashes, stats=None):
+    stats = stats if stats is not None else RunStats()
+    if not hashes:
+        return 0
+    try:
+        os.makedirs(library.library_path, exist_ok=True)
+    except OSError as error:
+        om.MGlobal.displayWarning(f"Could not create the material library {library.library_path}: {error}")
+        return 0
+    
+    selection = cmds.ls(selection=True) or []
+    exported = 0
+    try:
+        for result in results:
+            network_hash = hashes.get(result["name"])
+            # Networks sharing a file node with another material are not self-contained, so they stay out
+            if not network_hash or any(status == "Reused" for status, _, _ in result["report"]):
+                continue
+            try:
+                export_library_network(library, result["name"], network_hash, result["material"], result["shading_group"])
+            except RuntimeError as error:
+                om.MGlobal.displayWarning(f"Could not export {result['material']} to the material library: {error}")
+                continue
+            exported += 1
+    finally:
+        if selection:
+            cmds.select(selection, replace=True)
+        else:
+            cmds.select(clear=True)
+    
+    stats.count("materials exported", exported)
+    if exported and not library.save():
+        om.MGlobal.displayWarning(f"Could not write the material library manifest {library.manifest_path}")
+    return exported
+
+
+def build(
+    plan, naming="prefix", names=None, progress=None, shared_place2d=True, use_tx=False, probe=True, incremental=True,
+    reuse_files=True, stats=None, library=None, share_duplicates=True
+):
+    stats = stats if stats is not None else RunStats()
+    builder = ShaderNetworkBuilder(stats=stats)
+    names = plan.names if names is None else names
+    share_duplicates = reuse_files and share_duplicates
+    
+    if probe:
+        plan.probe(names, stats=stats)
+    if share_duplicates:
+        if progress:
+            progress("Looking for identical textures...", 0, len(names))
+        report_duplicates(plan.find_duplicates(names, stats=stats))
+    
+    if library:
+        # Library imports and the recorded networks are one undo step, and Cancel removes the imports again
+        cmds.undoInfo(openChunk=True, chunkName=BUILD_COMMAND)
+    try:
+        results = build_networks(
+            plan, builder, naming, names, progress, shared_place2d, use_tx, incremental, reuse_files, stats, library,
+            share_duplicates
+        )
+    finally:
+        if library:
+            cmds.undoInfo(closeChunk=True)
+    
+    if results:
+        report_memory(results)
+    return results
+
+
+def build_networks(
+    plan, builder, naming, names, progress, shared_place2d, use_tx, incremental, reuse_files, stats, library,
+    share_duplicates
+):
+    imported = []
+    hashes = {}
+    if library:
+        if progress:
+            progress("Importing from the material library...", 0, len(names))
+        # Imported before anything is recorded, so the default list indices the builder hands out stay free
+        with stats.phase("import library"):
+            imported, hashes = import_from_library(
+                plan, names, naming, library, builder.scene_index, shared_place2d, use_tx, stats, reuse_files,
+                share_duplicates
+            )
+    imported_names = {result["name"] for result in imported}
+    
+    results = []
+    with stats.phase("record networks"):
+        for i, name in enumerate(names):
+            if name in imported_names:
+                continue
+            # Cancel is only honoured between materials, so a material is never half recorded
+            if progress and not progress(f"Building: {name} ({i + 1}/{len(names)})", i, len(names)):
+                imported_nodes = [node for result in imported for node in result.pop("imported_nodes")]
+                if imported_nodes:
+                    cmds.delete(imported_nodes)
+                om.MGlobal.displayWarning("Shader creation cancelled, nothing was created.")
+                return []
+            
+            result = create_shaders(
+                plan, name, naming, builder=builder, shared_place2d=shared_place2d, use_tx=use_tx,
+                incremental=incremental, reuse_files=reuse_files, share_duplicates=share_duplicates
+            )
+            if result:
+                results.append(result)
+    
+    if progress:
+        progress("Creating nodes...", len(names), len(names))
+    
+    if results:
+        with stats.phase("create nodes"):
+            builder.commit()
+        stats.count("materials built", len(results))
+        stats.count("nodes created", builder.node_count)
+        stats.count("connections made", builder.connection_count)
+        
+        for result in results:
+            result["material"] = builder.name(result["material"])
+            result["shading_group"] = builder.name(result["shading_group"])
+            for texture_file, attr, file_node, output_attr in result.pop("pending_info"):
+                om.MGlobal.displayInfo(f"Connected {texture_file} to {result['material']}.{attr} using {builder.name(file_node)}.{output_attr}")
+            om.MGlobal.displayInfo(f"Created Material: {result['material']}, Shading Group: {result['shading_group']}")
+            
+        om.MGlobal.displayInfo(f"Built {len(results)} material(s) with {builder.node_count} node(s) and {builder.connection_count} connection(s) in one undo step.")
+    
+    if library:
+        with stats.phase("export library"):
+            exported = export_to_library(results, library, hashes, stats)
+        om.MGlobal.displayInfo(f"Imported {len(imported)} material(s) from {library.library_path}, exported {exported} new one(s).")
+        
+        for result in imported:
+            result.pop("imported_nodes")
+        order = {name: i for i, name in enumerate(names)}
+        results = sorted(imported + results, key=lambda result: order[result["name"]])
+    
+    return results
+
+
+def update_changed_shaders(
+    plan, changed, naming="prefix", shared_place2d=True, use_tx=False, reuse_files=True, stats=None, share_duplicates=True
+):
+    # Only shaders already in the scene are touched: new maps get connected and moved ones retargeted
+    names = sorted({name for name, suffix in changed if name in plan.texture_index.names})
+    if not names:
+        return [], []
+    
+    material_names = [shader_names(name, naming)[0] for name in names]
+    existing = set(cmds.ls(material_names) or [])
+    update_names = [name for name, material_name in zip(names, material_names) if material_name in existing]
+    new_names = [name for name, material_name in zip(names, material_names) if material_name not in existing]
+    
+    results = []
+    if update_names:
+        results = build(
+            plan, naming, update_names, shared_place2d=shared_place2d, use_tx=use_tx, incremental=True,
+            reuse_files=reuse_files, stats=stats, share_duplicates=share_duplicates
+        )
+    return results, new_names
+
+
+def name_tokens(name, ignored_tokens=(), case_sensitive=False):
+    # "|set|ns:crateWood-geo01" -> ("crate", "wood", "01") once "geo" is ignored
+    short_name = name.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+    short_name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Za-z])(?=[0-9])", "_", short_name)
+    if not case_sensitive:
+        short_name = short_name.lower()
+    return tuple(token for token in re.split(r"[\W_]+", short_name) if token and token not in ignored_tokens)
+
+
+class MeshIndex(object):
+    
+    def __init__(self, ignored_tokens=ASSIGN_IGNORED_TOKENS, case_sensitive=False):
+        self.ignored_tokens = {token if case_sensitive else token.lower() for token in ignored_tokens}
+        self.case_sensitive = case_sensitive
+        self.transforms = []
+        # Trie of name tokens: token -> child, None -> [(transform, start)] for each transform whose tokens from start end here
+        self.trie = {}
+        
+    def tokens(self, name):
+        return name_tokens(name, self.ignored_tokens, self.case_sensitive)
+        
+    def build(self):
+        # One ls for every mesh in the scene, the transforms are read off the shape paths
+        shapes = cmds.ls(type="mesh", long=True, noIntermediate=True, allPaths=True) or []
+        for transform in sorted({shape.rsplit("|", 1)[0] for shape in shapes}):
+            self.add(transform)
+        return self
+    
+    def add(self, transform):
+        self.transforms.append(transform)
+        tokens = self.tokens(transform)
+        # Every suffix is indexed too, so a name can be found in the middle of a mesh name
+        for start in range(len(tokens)):
+            node = self.trie
+            for token in tokens[start:]:
+                node = node.setdefault(token, {})
+            node.setdefault(None, []).append((transform, start))
+    
+    def find(self, tokens, rule="exact"):
+        node = self.trie
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return []
+        
+        if rule == "exact":
+            return [transform for transform, start in node.get(None, []) if start == 0]
+        matches = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for token, child in node.items():
+                if token is None:
+                    matches.extend(transform for transform, start in child if rule == "contains" or start == 0)
+                else:
+                    stack.append(child)
+        return matches
+
+
+def match_meshes(names, rules=ASSIGN_RULES, mesh_index=None):
+    # name -> [(transform, rule)], a mesh matching several names goes to the earliest rule, then the longest name
+    unknown = [rule for rule in rules if rule not in ASSIGN_RULE_CHOICES]
+    if unknown:
+        raise ValueError(f"Unknown assignment rule(s): {', '.join(unknown)}")
+    mesh_index = mesh_index or MeshIndex().build()
+    
+    best = {}
+    for name in names:
+        tokens = mesh_index.tokens(name)
+        if not tokens:
+            continue
+        for rank, rule in enumerate(rules):
+            score = (rank, -len(tokens))
+            for transform in mesh_index.find(tokens, rule):
+                if transform not in best or score < best[transform][0]:
+                    best[transform] = (score, name, rule)
+    
+    matches = {name: [] for name in names}
+    for transform in mesh_index.transforms:
+        if transform in best:
+            score, name, rule = best[transform]
+            matches[name].append((transform, rule))
+    return matches
+
+
+def assign_materials(
+    names, naming="prefix", rules=ASSIGN_RULES, ignored_tokens=ASSIGN_IGNORED_TOKENS, case_sensitive=False,
+    dry_run=False, stats=None
+):
+    stats = stats if stats is not None else RunStats()
+    with stats.phase("index meshes"):
+        mesh_index = MeshIndex(ignored_tokens, case_sensitive).build()
+    with stats.phase("match meshes"):
+        matches = match_meshes(names, rules, mesh_index)
+    
+    shading_group_names = [shader_names(name, naming)[1] for name in names]
+    existing = set(cmds.ls(shading_group_names, type="shadingEngine") or []) if shading_group_names else set()
+    
+    assignments = []
+    for name, shading_group_name in zip(names, shading_group_names):
+        meshes = matches[name]
+        if not meshes:
+            status = "No Mesh"
+        elif shading_group_name not in existing:
+            status = "No Shader"
+        else:
+            status = "Would Assign" if dry_run else "Assigned"
+        assignments.append({
+            "name": name,
+            "material": shader_names(name, naming)[0],
+            "shading_group": shading_group_name,
+            "status": status,
+            "meshes": meshes
+        })
+    
+    to_assign = [assignment for assignment in assignments if assignment["status"] == "Assigned"]
+    if to_assign:
+        with stats.phase("assign materials"):
+            # One forceElement per shading group with all of its meshes, the whole pass is one undo step
+            cmds.undoInfo(openChunk=True, chunkName=ASSIGN_UNDO_CHUNK)
+            try:
+                for assignment in to_assign:
+                    meshes = [transform for transform, rule in assignment["meshes"]]
+                    cmds.sets(meshes, edit=True, forceElement=assignment["shading_group"])
+            finally:
+                cmds.undoInfo(closeChunk=True)
+    
+    stats.count("meshes indexed", len(mesh_index.transforms))
+    stats.count("meshes matched", sum(len(assignment["meshes"]) for assignment in assignments))
+    report_assignments(assignments, dry_run)
+    return assignments
+
+
+def report_assignments(assignments, dry_run=False):
+    verb = "Would assign" if dry_run else "Assigned"
+    for assignment in assignments:
+        if assignment["status"] in ("Assigned", "Would Assign"):
+            om.MGlobal.displayInfo(f"{verb} {assignment['shading_group']} to {len(assignment['meshes'])} mesh(es).")
+    
+    no_shader = [assignment["shading_group"] for assignment in assignments if assignment["status"] == "No Shader"]
+    if no_shader:
+        om.MGlobal.displayWarning(f"Not assigned, the shading group does not exist yet: {', '.join(no_shader)}")
+    no_mesh = [assignment["name"] for assignment in assignments if assignment["status"] == "No Mesh"]
+    if no_mesh:
+        om.MGlobal.displayWarning(f"No mesh name matches: {', '.join(no_mesh)}")
+    
+    meshes = sum(len(assignment["meshes"]) for assignment in assignments if assignment["status"] in ("Assigned", "Would Assign"))
+    om.MGlobal.displayInfo(f"{verb} {meshes} mesh(es) to {len(assignments) - len(no_shader) - len(no_mesh)} material(s).")
+
+
+def report_duplicates(groups):
+    # Only the groups this batch reads from are listed, the rest were reported when their materials were built
+    for group in groups:
+        om.MGlobal.displayInfo(f"Identical textures: {', '.join(os.path.basename(texture.path) for suffix, texture in group)}")
+    if groups:
+        copies = sum(len(group) - 1 for group in groups)
+        om.MGlobal.displayInfo(f"Found {copies} byte-identical texture copies, copies used for the same map share one file node.")
+
+
+def report_memory(results):
+    for result in results:
+        for large_texture in result["large_textures"]:
+            om.MGlobal.displayWarning(f"{result['material']}: {large_texture}")
+    
+    batch_memory = sum(result["memory"] for result in results)
+    om.MGlobal.displayInfo(f"Uncompressed texture memory for this batch: {images.format_bytes(batch_memory)}")
+
+
+def batch_report(results):
+    rows = []
+    for result in results:
+        material = result["material"]
+        rows.append({
+            "material": material, "status": "Memory", "map": "",
+            "message": f"Texture memory: {images.format_bytes(result['memory'])}"
+        })
+        for large_texture in result["large_textures"]:
+            rows.append({"material": material, "status": "Large", "map": "", "message": large_texture})
+        for status, suffix, message in result["report"]:
+            rows.append({"material": material, "status": status, "map": suffix, "message": message})
+    return rows
+
+
+def assignment_report(assignments):
+    rows = []
+    for assignment in assignments:
+        material = assignment["material"]
+        if not assignment["meshes"]:
+            rows.append({
+                "material": material, "status": assignment["status"], "map": "",
+                "message": f"No mesh name matches {assignment['name']}"
+            })
+        for transform, rule in assignment["meshes"]:
+            rows.append({"material": material, "status": assignment["status"], "map": rule, "message": transform})
+    return rows
+
+
+def export_report(rows, path):
+    # The extension picks the format, anything but .json is written as CSV
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, "w") as report_file:
+            json.dump(rows, report_file, indent=2)
+    else:
+        with open(path, "w", newline="") as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=REPORT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    return path
+
+
+def shader_names(name, naming="prefix"):
+    if naming.lower() == "suffix":
+        return f"{name}_mtl", f"{name}_sG"
+    return f"mtl_{name}", f"sG_{name}"
+
+
+def create_shaders(
+    plan, name, naming="prefix", progress=None, builder=None, shared_place2d=True, use_tx=False, incremental=True,
+    reuse_files=True, share_duplicates=True
+):
+    if builder is None:
+        results = build(
+            plan, naming, [name], progress, shared_place2d, use_tx, incremental=incremental, reuse_files=reuse_files,
+            share_duplicates=share_duplicates
+        )
+        return results[0] if results else None
+    
+    if not name.strip():
+        om.MGlobal.displayError("No valid name provided for the shader.")
+        return None
+    
+    material_name, shading_group_name = shader_names(name, naming)
+
+    scene_index = builder.scene_index
+    existing_files = {}
+    if not scene_index.exists(material_name):
+        material = builder.create_node("aiStandardSurface", material_name, "shader")
+    else:
+        material = builder.node(material_name)
+        om.MGlobal.displayWarning(f"Material '{material_name}' already exists. Using existing one.")
+        if incremental:
+            existing_files = existing_texture_network(plan, material_name, shading_group_name, scene_index)
+
+    if not scene_index.exists(shading_group_name):
+        shading_group = builder.create_shading_group(shading_group_name)
+    else:
+        shading_group = builder.node(shading_group_name)
+        om.MGlobal.displayWarning(f"Shading Group '{shading_group_name}' already exists. Using existing one.")
+
+    builder.connect(material, "outColor", shading_group, "surfaceShader", force=True)
+    
+    result = {"name": name, "material": material, "shading_group": shading_group}
+    with builder.stats.phase("search textures"):
+        result.update(search_existing_textures(
+            plan, name, material_name, material, shading_group, builder, shared_place2d, use_tx, existing_files,
+            reuse_files, share_duplicates
+        ))
+    return result
+
+
+def find_upstream_file(plug, scene_index, max_depth=4):
+    nodes = cmds.listConnections(plug, source=True, destination=False) or []
+    for _ in range(max_depth):
+        for node in nodes:
+            if scene_index.node_type(node) == "file":
+                return node
+        nodes = [
+            upstream for node in nodes
+            for upstream in cmds.listConnections(node, source=True, destination=False) or []
+        ]
+    return None
+
+
+def existing_texture_network(plan, material_name, shading_group_name, scene_index):
+    # Map suffix -> file node already driving that slot of the material, following the utility nodes in between
+    existing_files = {}
+    for suffix, (role, attr, is_raw, use_red_channel) in plan.texture_maps().items():
+        if role == "displacement":
+            plug = f"{shading_group_name}.displacementShader"
+            if not scene_index.exists(shading_group_name):
+                continue
+        else:
+            plug = f"{material_name}.{attr}"
+        
+        file_node = find_upstream_file(plug, scene_index)
+        if file_node:
+            existing_files[suffix] = file_node
+    return existing_files
+
+
+def shared_texture_files(plan, texture, texture_file, use_tx=False, share_duplicates=False):
+    # The texture's own path first, then every byte-identical copy a file node may already read
+    if not share_duplicates:
+        return [texture_file]
+    return [texture_file] + [
+        resolve_texture_path(other, use_tx) for other in plan.identical_textures(texture) if other is not texture
+    ]
+
+
+def reads_texture(plan, path, texture, share_duplicates=False):
+    # The .tx and the proxies of a texture are the same file to an incremental build, whichever one the node reads
+    key = path_key(full_resolution_path(plan, path))
+    textures = [texture]
+    if share_duplicates:
+        textures += [other for other in plan.identical_textures(texture) if other is not texture]
+    return any(key in (path_key(other.path), path_key(tx_path(other.path))) for other in textures)
+
+
+def find_reusable_file(scene_index, texture_files):
+    for texture_file in texture_files:
+        file_node = scene_index.file_for_path(texture_file)
+        if file_node:
+            return file_node
+    return None
+
+
+def find_downstream_shaders(file_node, scene_index, max_depth=4):
+    shaders = set()
+    nodes = cmds.listConnections(file_node, source=False, destination=True) or []
+    for _ in range(max_depth):
+        downstream = []
+        for node in nodes:
+            if scene_index.node_type(node) in ("aiStandardSurface", "shadingEngine"):
+                shaders.add(node)
+            else:
+                downstream.extend(cmds.listConnections(node, source=False, destination=True) or [])
+        nodes = downstream
+    return shaders
+
+
+def can_retarget(builder, file_node, material_name):
+    # Repointing a file node another material also reads would silently change that material too
+    if file_node in builder.claimed_files:
+        return False
+    own_shaders = {material_name}
+    own_shaders.update(cmds.listConnections(f"{material_name}.outColor", source=False, destination=True) or [])
+    return find_downstream_shaders(file_node, builder.scene_index) <= own_shaders
+
+
+def connect_packed_channels(builder, file_node, name, suffix, material, channel_attrs):
+    outputs = []
+    for channel, role, attr in channel_attrs:
+        if role == "roughness":
+            color_correct_rough = builder.create_node("aiColorCorrect", f"{name}_{suffix}_colorCorrect", "utility")
+            builder.connect(file_node, "outColor", color_correct_rough, "input")
+            builder.connect(color_correct_rough, f"outColor{channel}", material, attr, force=True)
+        else:
+            builder.connect(file_node, f"outColor{channel}", material, attr, force=True)
+        outputs.append((attr, f"outColor{channel}"))
+    return outputs
+
+
+def connect_map(builder, file_node, name, suffix, role, attr, use_red_channel, info, material, shading_group):
+    output_attr = "outColor" if not use_red_channel else "outColorR"
+
+    if role == "normal":
+        normal_node = builder.create_node("aiNormalMap", f"{name}_normalMap", "utility")
+        builder.connect(file_node, "outColor", normal_node, "input")
+        builder.connect(normal_node, "outValue", material, "normalCamera", force=True)
+
+    elif role == "displacement":
+        displacement_node = builder.create_node("displacementShader", f"{name}_displacement", "shader")
+        
+        # Floating point height maps are already centred on zero, 8/16-bit ones on mid grey
+        midpoint = 0.0 if info and info.is_float else 0.5
+        subtract_node = builder.create_node("aiSubtract", f"{name}_subtract", "utility")
+        builder.set_attr(subtract_node, "input2R", midpoint)
+        builder.set_attr(subtract_node, "input2G", midpoint)
+        builder.set_attr(subtract_node, "input2B", midpoint)
+        
+        multiply_node = builder.create_node("aiMultiply", f"{name}_multiply", "utility")
+        builder.set_attr(multiply_node, "input2R", 1.0)
+        builder.set_attr(multiply_node, "input2G", 1.0)
+        builder.set_attr(multiply_node, "input2B", 1.0)
+        
+        builder.connect(file_node, "outColor", subtract_node, "input1")
+        builder.connect(subtract_node, "outColor", multiply_node, "input1")
+        builder.connect(multiply_node, "outColor", displacement_node, "vectorDisplacement")
+        builder.connect(displacement_node, "displacement", shading_group, "displacementShader", force=True)
+    elif role == "base_color":
+        color_correct = builder.create_node("aiColorCorrect", f"{name}_{suffix}_colorCorrect", "utility")
+        builder.connect(file_node, output_attr, color_correct, "input")
+        builder.connect(color_correct, "outColor", material, attr, force=True)
+    elif role == "roughness":
+        color_correct_rough = builder.create_node("aiColorCorrect", f"{name}_{suffix}_colorCorrect", "utility")
+        builder.connect(file_node, "outColor", color_correct_rough, "input")
+        builder.connect(color_correct_rough, "outColorR", material, attr, force=True)
+    else:
+        builder.connect(file_node, "outAlpha", material, attr, force=True)
+    return [(attr, output_attr)]
+
+
+def search_existing_textures(
+    plan, name, material_name, material, shading_group, builder, shared_place2d=True, use_tx=False, existing_files=None,
+    reuse_files=True, share_duplicates=False
+):
+    texture_map = plan.texture_maps()
+    scene_index = builder.scene_index
+    stats = builder.stats
+    existing_files = existing_files or {}
+    
+    connection_list = []
+    no_texture_found_list = []
+    # (status, suffix, message) per map, for the batch report
+    report = []
+    pending_info = []
+    large_textures = []
+    memory = 0
+    place2d = None
+    
+    if shared_place2d:
+        # New maps on an existing material join the placement its other maps already use
+        for file_node in existing_files.values():
+            existing_place2d = cmds.listConnections(f"{file_node}.uvCoord", source=True, destination=False)
+            if existing_place2d:
+                place2d = builder.node(existing_place2d[0])
+                break
+    
+    def connect_texture(suffix, texture, attrs, existing_file, can_retarget_file, file_attrs, connect, label=""):
+        # Packed and single maps alike: an unchanged node is left alone, one only this material reads is retargeted,
+        # anything else gets a reused or new file node that connect() wires into the material
+        nonlocal memory, place2d
+        texture_file = resolve_texture_path(texture, use_tx)
+        info = plan.texture_info(texture)
+        texture_memory = plan.texture_memory(texture)
+        memory += texture_memory
+        if info and max(info.width, info.height) >= LARGE_TEXTURE_SIZE:
+            large_textures.append(f"{os.path.basename(texture.path)} is {info.describe()}")
+        
+        # A node on the .tx or a proxy of the texture keeps the resolution it was switched to
+        if existing_file and reads_texture(plan, scene_index.file_path(existing_file), texture, share_duplicates):
+            message = f"Unchanged {os.path.basename(texture_file)} on {material_name}'s {attrs}"
+            connection_list.append(message)
+            report.append(("Unchanged", suffix, message))
+            stats.count("maps unchanged")
+            return
+        
+        if existing_file and can_retarget_file and can_retarget(builder, existing_file, material_name):
+            builder.claimed_files.add(existing_file)
+            file_node = builder.node(existing_file)
+            builder.set_attr(file_node, "fileTextureName", texture_file)
+            builder.set_attr(file_node, "uvTilingMode", 3 if texture.has_udims else 0)
+            scene_index.add_file(existing_file, texture_file)
+            pending_info.append((texture_file, attrs, file_node, "fileTextureName"))
+            message = f"Retargeted {existing_file} to {os.path.basename(texture_file)} on {material_name}'s {attrs}"
+            connection_list.append(message)
+            report.append(("Retargeted", suffix, message))
+            stats.count("maps retargeted")
+            return
+        
+        # A file node elsewhere in the scene already reading this texture is shared rather than duplicated
+        texture_files = shared_texture_files(plan, texture, texture_file, use_tx, share_duplicates)
+        reused_file = find_reusable_file(scene_index, texture_files) if reuse_files else None
+        if reused_file:
+            builder.claimed_files.add(reused_file)
+            file_node = builder.node(reused_file)
+        else:
+            file_name = scene_index.unique_name(f"{name}_{suffix}_file")
+            file_node = builder.create_node("file", file_name, "texture")
+            builder.set_attr(file_node, "fileTextureName", texture_file)
+            scene_index.add_file(file_name, texture_file)
+            for attr, value in file_attrs:
+                builder.set_attr(file_node, attr, value)
+            if texture.has_udims:
+                builder.set_attr(file_node, "uvTilingMode", 3)
+
+            if not shared_place2d:
+                place2d = builder.create_node("place2dTexture", f"{name}_{suffix}_place2d", "utility")
+            elif place2d is None:
+                place2d = builder.create_node("place2dTexture", f"{name}_place2d", "utility")
+            for place2d_attr, file_attr in PLACE2D_CONNECTIONS:
+                builder.connect(place2d, place2d_attr, file_node, file_attr)
+        
+        for attr, output_attr in connect(file_node, info):
+            pending_info.append((texture_file, attr, file_node, output_attr))
+
+        details = [f"{texture.tile_count} UDIM tiles"] if texture.has_udims else []
+        if info:
+            details.append(f"{info.describe()}, {images.format_bytes(texture_memory)}")
+        details_info = f" ({'; '.join(details)})" if details else ""
+        
+        if reused_file:
+            identical = "" if path_key(scene_index.file_path(reused_file)) == path_key(texture_file) else "identical "
+            message = f"Reused {reused_file} for {identical}{os.path.basename(texture_file)} on {material_name}'s {attrs}"
+            report.append(("Reused", suffix, message))
+            stats.count("maps reused")
+        else:
+            message = f"Connected {label}{os.path.basename(texture_file)}{details_info} to {material_name}'s {attrs}"
+            report.append(("Connected", suffix, message))
+            stats.count("maps connected")
+        connection_list.append(message)
+    
+    packed = plan.find_packed(name)
+    covered_roles = set(packed[1]) if packed else set()
+    if packed:
+        suffix, channel_roles, texture = packed
+        channel_attrs = [(channel, role, TEXTURE_MAPS[role][0]) for channel, role in zip("RGB", channel_roles)]
+        # One file node driving every channel of the material is the packed network already in place
+        existing_nodes = {existing_files.get(plan.conventions.get(role)) for role in channel_roles}
+        existing_file = existing_nodes.pop() if len(existing_nodes) == 1 else None
+        # Every channel is data, so the whole texture is read Raw
+        file_attrs = [("colorSpace", RAW_COLORSPACE), ("ignoreColorSpaceFileRules", True)]
+        connect_texture(
+            suffix, texture, ", ".join(attr for channel, role, attr in channel_attrs), existing_file, True, file_attrs,
+            lambda file_node, info: connect_packed_channels(builder, file_node, name, suffix, material, channel_attrs),
+            "packed "
+        )
+        stats.count("packed maps")
+
+    for suffix, (role, attr, is_raw, use_red_channel) in texture_map.items():
+        if role in covered_roles:
+            continue
+        texture = plan.find(name, suffix)
+
+        if not texture:
+            message = f"No texture found for {suffix} or it isn't named as: {name}_{suffix}' in sourceimages."
+            no_texture_found_list.append(message)
+            report.append(("Missing", suffix, message))
+            stats.count("maps missing")
+            continue  
+        
+        existing_file = existing_files.get(suffix)
+        # A packed file node driving several slots stays as it is when those slots now get maps of their own
+        shared_slots = list(existing_files.values()).count(existing_file)
+        file_attrs = []
+        colorspace = choose_colorspace(role, is_raw, plan.texture_info(texture))
+        if colorspace:
+            file_attrs += [("colorSpace", colorspace), ("ignoreColorSpaceFileRules", True)]
+        if is_raw:
+            file_attrs.append(("alphaIsLuminance", role != "roughness"))
+        connect_texture(
+            suffix, texture, attr, existing_file, shared_slots == 1, file_attrs,
+            lambda file_node, info: connect_map(
+                builder, file_node, name, suffix, role, attr, use_red_channel, info, material, shading_group
+            )
+        )
+
+    return {
+        "connections": connection_list,
+        "missing": no_texture_found_list,
+        "report": report,
+        "pending_info": pending_info,
+        "memory": memory,
+        "large_textures": large_textures
+    }
@@ -0,0 +1,388 @@
+import os
+import sys
+import mmap
+import shlex
+import shutil
+import struct
+import hashlib
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PROBE_WORKERS = 8
+HASH_WORKERS = 4
+HASH_CHUNK_SIZE = 1 << 22
+# Formats Pillow can both read and write, float EXRs are left to the .tx converter
+PROXY_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tga", ".tif", ".tiff"}
+# JPEG headers can carry large EXIF/ICC blocks before the frame header, never read further than this
+JPEG_SCAN_LIMIT = 1 << 20
+
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+EXR_PIXEL_BITS = {0: 32, 1: 16, 2: 32}
+
+
+class ImageInfo(object):
+
+    def __init__(self, width, height, bit_depth, channels, is_float=False):
+        self.width = width
+        self.height = height
+        self.bit_depth = bit_depth
+        self.channels = channels
+        self.is_float = is_float
+
+    @property
+    def memory(self):
+        return self.width * self.height * self.channels * self.bit_depth // 8
+
+    def describe(self):
+        pixel_type = "float" if self.is_float else "bit"
+        return f"{self.width}x{self.height} {self.bit_depth}-{pixel_type} {self.channels}ch"
+
+    def to_list(self):
+        return [self.width, self.height, self.bit_depth, self.channels, self.is_float]
+
+    @classmethod
+    def from_list(cls, values):
+        return cls(*values)
+
+
+def format_bytes(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024.0
+
+
+def read_png(image_file):
+    header = image_file.read(26)
+    if len(header) < 26 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", header[16:26])
+    if color_type == 3:
+        # Palette indices expand to 8-bit RGB
+        bit_depth = 8
+    return ImageInfo(width, height, bit_depth, PNG_CHANNELS.get(color_type, 3))
+
+
+def read_jpeg(image_file):
+    if image_file.read(2) != b"\xff\xd8":
+        return None
+
+    while image_file.tell() < JPEG_SCAN_LIMIT:
+        marker = image_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0x01, 0xFF) or 0xD0 <= marker[1] <= 0xD7:
+            # Standalone markers and fill bytes carry no length
+            if marker[1] == 0xFF:
+                image_file.seek(-1, os.SEEK_CUR)
+            continue
+
+        length_data = image_file.read(2)
+        if len(length_data) < 2:
+            return None
+        length = struct.unpack(">H", length_data)[0]
+
+        if marker[1] in JPEG_SOF_MARKERS:
+            frame = image_file.read(6)
+            if len(frame) < 6:
+                return None
+            precision, height, width, components = struct.unpack(">BHHB", frame)
+            return ImageInfo(width, height, precision, components)
+
+        image_file.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def read_tga(image_file):
+    header = image_file.read(18)
+    if len(header) < 18:
+        return None
+
+    image_type = header[2]
+    width, height, pixel_depth = struct.unpack("<HHB", header[12:17])
+    if image_type not in (1, 2, 3, 9, 10, 11) or not width or not height:
+        return None
+
+    if image_type in (3, 11):
+        channels = 1
+    elif image_type in (1, 9):
+        channels = 3
+    else:
+        channels = 4 if pixel_depth == 32 or header[17] & 0x0F else 3
+    return ImageInfo(width, height, 8, channels)
+
+
+def read_tiff(image_file):
+    header = image_file.read(8)
+    if len(header) < 8 or header[:2] not in (b"II", b"MM"):
+        return None
+
+    order = "<" if header[:2] == b"II" else ">"
+    magic, ifd_offset = struct.unpack(f"{order}HI", header[2:8])
+    if magic != 42:
+        return None
+
+    image_file.seek(ifd_offset)
+    count_data = image_file.read(2)
+    if len(count_data) < 2:
+        return None
+    entry_count = struct.unpack(f"{order}H", count_data)[0]
+    entries = image_file.read(entry_count * 12)
+
+    tags = {}
+    for i in range(min(entry_count, len(entries) // 12)):
+        tag, field_type, count = struct.unpack(f"{order}HHI", entries[i * 12:i * 12 + 8])
+        value_data = entries[i * 12 + 8:i * 12 + 12]
+        # Only the first value matters here; SHORT values sit in the first two bytes of the field
+        if field_type == 3:
+            value = struct.unpack(f"{order}H", value_data[:2])[0]
+            if count > 2:
+                offset = struct.unpack(f"{order}I", value_data)[0]
+                position = image_file.tell()
+                image_file.seek(offset)
+                value = struct.unpack(f"{order}H", image_file.read(2))[0]
+                image_file.seek(position)
+        else:
+            value = struct.unpack(f"{order}I", value_data)[0]
+        tags[tag] = (value, count)
+
+    if 256 not in tags or 257 not in tags:
+        return None
+
+    bits_per_sample, sample_count = tags.get(258, (1, 1))
+    channels = tags.get(277, (sample_count, 1))[0]
+    is_float = tags.get(339, (1, 1))[0] == 3
+    return ImageInfo(tags[256][0], tags[257][0], bits_per_sample, channels, is_float)
+
+
+def read_null_terminated(image_file, limit=256):
+    data = bytearray()
+    while len(data) < limit:
+        char = image_file.read(1)
+        if not char or char == b"\x00":
+            return data.decode("latin-1") if char else None
+        data += char
+    return None
+
+
+def read_exr(image_file):
+    header = image_file.read(8)
+    if len(header) < 8 or header[:4] != b"\x76\x2f\x31\x01":
+        return None
+
+    channel_bits = []
+    data_window = None
+    while True:
+        name = read_null_terminated(image_file)
+        if not name:
+            break
+        attribute_type = read_null_terminated(image_file)
+        size_data = image_file.read(4)
+        if attribute_type is None or len(size_data) < 4:
+            return None
+        size = struct.unpack("<i", size_data)[0]
+        value = image_file.read(size)
+
+        if name == "channels" and attribute_type == "chlist":
+            position = 0
+            while position < len(value) and value[position] != 0:
+                position = value.index(b"\x00", position) + 1
+                channel_bits.append(EXR_PIXEL_BITS.get(struct.unpack("<i", value[position:position + 4])[0], 16))
+                position += 16
+        elif name == "dataWindow" and attribute_type == "box2i":
+            data_window = struct.unpack("<iiii", value[:16])
+
+    if not channel_bits or not data_window:
+        return None
+
+    x_min, y_min, x_max, y_max = data_window
+    return ImageInfo(x_max - x_min + 1, y_max - y_min + 1, max(channel_bits), len(channel_bits), True)
+
+
+IMAGE_READERS = {
+    ".png": read_png,
+    ".jpg": read_jpeg,
+    ".jpeg": read_jpeg,
+    ".tga": read_tga,
+    ".tif": read_tiff,
+    ".tiff": read_tiff,
+    ".tx": read_tiff,
+    ".exr": read_exr,
+}
+
+
+def read_image_info(path):
+    reader = IMAGE_READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        return None
+
+    try:
+        with open(path, "rb") as image_file:
+            return reader(image_file)
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def probe_images(paths, cache=None, workers=PROBE_WORKERS):
+    # cache maps path -> [mtime_ns, size, *ImageInfo.to_list()] and is updated in place
+    cache = {} if cache is None else cache
+
+    def probe(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+
+        cached = cache.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return path, ImageInfo.from_list(cached[2:])
+
+        info = read_image_info(path)
+        if info:
+            cache[path] = [stat.st_mtime_ns, stat.st_size] + info.to_list()
+        return path, info
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return dict(executor.map(probe, paths))
+
+
+def file_digest(path, chunk_size=HASH_CHUNK_SIZE):
+    # The file is mapped instead of read, chunks are hashed straight from the page cache without a copy
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as image_file:
+            size = os.fstat(image_file.fileno()).st_size
+            if size:
+                with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    for offset in range(0, size, chunk_size):
+                        digest.update(view[offset:offset + chunk_size])
+    except (OSError, ValueError):
+        return None
+    return digest.hexdigest()
+
+
+def fingerprint_files(paths, cache=None, workers=HASH_WORKERS):
+    # cache maps path -> [mtime_ns, size, digest] and is updated in place
+    cache = {} if cache is None else cache
+
+    def fingerprint(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+
+        cached = cache.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return path, cached[2]
+
+        digest = file_digest(path)
+        if digest:
+            cache[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return path, digest
+
+    # hashlib lets go of the GIL on large buffers, so threads hash several files at once
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return dict(executor.map(fingerprint, paths))
+
+
+def proxy_is_current(source, proxy):
+    try:
+        return os.stat(proxy).st_mtime >= os.stat(source).st_mtime
+    except OSError:
+        return False
+
+
+def make_proxy(source, proxy, size):
+    # Runs in a worker process, so it only returns plain values
+    extension = os.path.splitext(source)[1].lower()
+    if Image is None:
+        return source, "Pillow is not installed"
+    if extension not in PROXY_EXTENSIONS:
+        return source, f"{extension} images are not supported"
+    
+    base_path, proxy_extension = os.path.splitext(proxy)
+    temp_path = f"{base_path}.tmp{proxy_extension}"
+    try:
+        os.makedirs(os.path.dirname(proxy), exist_ok=True)
+        with Image.open(source) as image:
+            if max(image.size) <= size:
+                shutil.copyfile(source, temp_path)
+            else:
+                image_format = image.format
+                # JPEGs are decoded straight at the reduced scale, everything else is read once and shrunk
+                image.draft(image.mode, (size, size))
+                image.thumbnail((size, size))
+                image.save(temp_path, format=image_format)
+        os.replace(temp_path, proxy)
+    except (OSError, ValueError) as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return source, str(e)
+    return source, None
+
+
+def split_command(command):
+    # POSIX splitting eats the backslashes of Windows paths, there quotes are stripped by hand instead
+    if os.name != "nt":
+        return shlex.split(command)
+    return [
+        arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] and arg[0] in "\"'" else arg
+        for arg in shlex.split(command, posix=False)
+    ]
+
+
+def python_executable():
+    # Inside Maya sys.executable is Maya itself, worker processes have to start the mayapy next to it
+    executable = sys.executable
+    name = os.path.basename(executable).lower()
+    if name.startswith("maya") and not name.startswith("mayapy"):
+        for candidate in ("mayapy", "mayapy.exe"):
+            path = os.path.join(os.path.dirname(executable), candidate)
+            if os.path.isfile(path):
+                return path
+    return executable
+
+
+def make_proxies(jobs, size, workers=None, progress=None):
+    # jobs is a list of (source, proxy); decoding and resizing is CPU bound, so each worker is a process
+    result = {"generated": [], "failed": [], "cancelled": False}
+    if not jobs:
+        return result
+    if Image is None:
+        result["failed"] = [(source, "Pillow is not installed") for source, proxy in jobs]
+        return result
+    
+    context = multiprocessing.get_context("spawn")
+    context.set_executable(python_executable())
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=context) as executor:
+            proxies = [executor.submit(make_proxy, source, proxy, size) for source, proxy in jobs]
+            
+            for i, proxy in enumerate(as_completed(proxies), start=1):
+                source, error = proxy.result()
+                if error:
+                    result["failed"].append((source, error))
+                else:
+                    result["generated"].append(source)
+                
+                if progress and not progress(f"Resizing: {os.path.basename(source)} ({i}/{len(jobs)})", i, len(jobs)):
+                    for pending in proxies:
+                        pending.cancel()
+                    result["cancelled"] = True
+                    break
+    except (BrokenProcessPool, OSError) as e:
+        # The workers could not start or died: no mayapy next to Maya, or a script without a __main__ guard
+        done = set(result["generated"]) | {source for source, error in result["failed"]}
+        result["failed"].extend(
+            (source, f"The worker processes failed: {e}") for source, proxy in jobs if source not in done
+        )
+    
+    return result